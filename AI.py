@@ -4,13 +4,16 @@ Created on Dec 3, 2016
 @author: Sam Ragusa
 '''
 
+import time
 import random
 import json
+import hashlib
+import numpy as np
 from ast import literal_eval
 from Board import Board
 from Player import Player
-from Value_Iteration_AI import Value_Iteration_AI
-import matplotlib.pyplot as plt
+from Transition_Table import Transition_Table
+from Match_Log import Outcome_Statistics, get_interval_counts
 
 
 def reward_function(state_info1, state_info2):
@@ -30,30 +33,47 @@ def reward_function(state_info1, state_info2):
 
 class Q_Learning_AI(Player):
     """
+    When not training (see set_training), the AI only reads its transitions: it doesn't look
+    for/add currently unknown transitions and doesn't update any values.  It can then also
+    read them from a Shared_Transition_Table instead of its own dictionary.
+
+    With canonical states, the AI's states are found from the canonical form of every board
+    configuration (see Board.get_canonical_spots), as though it were always player 1.  A table
+    learned this way (or learned as player 1 either way) then serves the AI as either player.
+
     TO-DO:
-    1) add ability to not train when wanted in a more efficient way
-        A) when not training also don't look for/add currently unknown states
-        B) do this by having an instance variable saying if it's testing or training
-        C) and let a function set that parameter
-    2) handle the rewards function which is coded as if the function were already defined
+    1) handle the rewards function which is coded as if the function were already defined
     """
 
     def __init__(self, the_player_id, the_learning_rate, the_discount_factor, info_location=None,
-                 the_random_move_probability=0, the_board=None):
+                 the_random_move_probability=0, the_board=None, the_replay_buffer=None, the_replay_batch_size=32,
+                 the_replay_frequency=4, the_canonical_states=False):
         """
         Initialize the instance variables to be stored by the AI. 
+
+        If given a Replay_Buffer, updates are stored in it instead of being applied right away,
+        and every the_replay_frequency stored updates a minibatch of the_replay_batch_size
+        entries is sampled from it and applied.
         """
         self.random_move_probability = the_random_move_probability
+        self.replay_buffer = the_replay_buffer
+        self.replay_batch_size = the_replay_batch_size
+        self.replay_frequency = the_replay_frequency
+        self.updates_since_replay = 0
+        self.training = True
+        self.shared_transitions = None
+        self.state_visits = {}
         self.learning_rate = the_learning_rate
         self.discount_factor = the_discount_factor
         self.player_id = the_player_id
+        self.canonical_states = the_canonical_states
         self.board = the_board
         self.pre_last_move_state = None
         self.post_last_move_state = None
         if not info_location is None:
             self.load_transition_information(info_location)
         else:
-            self.transitions = {}
+            self.transitions = Transition_Table()
 
     def set_random_move_probability(self, probability):
         """
@@ -67,6 +87,35 @@ class Q_Learning_AI(Player):
         """
         self.learning_rate = the_learning_rate
 
+    def set_training(self, training):
+        """
+        Sets weather the AI is training.  When it's not, it won't add transitions or update
+        their values, and unknown transitions are treated as having the initial transition value.
+        """
+        self.training = training
+        self.pre_last_move_state = None
+        self.post_last_move_state = None
+
+    def use_shared_transitions(self, table):
+        """
+        Stops training and reads transition values from the given Shared_Transition_Table
+        instead of self.transitions .  Giving None goes back to using self.transitions .
+        """
+        self.set_training(False)
+        self.shared_transitions = table
+
+    def get_learned_data_digest(self):
+        """
+        Gets a digest of the transition values the AI plays by (the shared table's, if it uses one).
+        """
+        digest = hashlib.sha1()
+        if self.shared_transitions is not None:
+            digest.update(self.shared_transitions.keys.tobytes())
+            digest.update(self.shared_transitions.values.tobytes())
+        else:
+            digest.update(repr(sorted(self.transitions.items())).encode())
+        return digest.hexdigest()
+
     def get_states_from_boards_spots(self, boards_spots):
         """
         Gets an array of tuples from the given set of board spots,
@@ -76,6 +125,11 @@ class Q_Learning_AI(Player):
         Format of returned data:
         [(own_pieces, opp_pieces, own_kings, opp_kings, own_edges, own_vert_center_mass, opp_vert_center_mass), ...]
         """
+        player_id = self.player_id
+        if self.canonical_states and not player_id:
+            boards_spots = [self.board.get_rotated_spots(spots) for spots in boards_spots]
+            player_id = True
+
         piece_counters = [[0, 0, 0, 0, 0, 0, 0] for j in range(len(boards_spots))]
 
         for k in range(len(boards_spots)):
@@ -83,8 +137,8 @@ class Q_Learning_AI(Player):
                 for i in range(len(boards_spots[k][j])):
                     if boards_spots[k][j][i] != 0:
                         piece_counters[k][boards_spots[k][j][i] - 1] = piece_counters[k][boards_spots[k][j][i] - 1] + 1
-                        if (self.player_id and (boards_spots[k][j][i] == 1 or boards_spots[k][j][i] == 3)) or (
-                                    not self.player_id and (boards_spots[k][j][i] == 2 or boards_spots[k][j][i] == 4)):
+                        if (player_id and (boards_spots[k][j][i] == 1 or boards_spots[k][j][i] == 3)) or (
+                                    not player_id and (boards_spots[k][j][i] == 2 or boards_spots[k][j][i] == 4)):
                             if i == 0 and j % 2 == 0:
                                 piece_counters[k][4] = piece_counters[k][4] + 1
                             elif i == 3 and j % 2 == 1:
@@ -131,15 +185,89 @@ class Q_Learning_AI(Player):
         except:
             return []
 
+    def update_transition(self, transition, cur_state, game_over=False):
+        """
+        Applies the Q-learning update to the value of the given transition, where
+        cur_state is the state the board was in when it was next the AI's turn (or
+        when the game ended if game_over is True).
+        """
+        reward = reward_function(transition[0], cur_state)
+        if self.replay_buffer is not None:
+            self.state_visits[transition[0]] = self.state_visits.get(transition[0], 0) + 1
+            self.replay_buffer.add(transition, reward, cur_state, game_over)
+            self.updates_since_replay = self.updates_since_replay + 1
+            if self.updates_since_replay >= self.replay_frequency:
+                self.replay_experience()
+                self.updates_since_replay = 0
+            return
+
+        max_future_state = None
+        if not game_over:
+            max_future_state = self.get_optimal_potential_value(1, cur_state)
+        self.apply_update(transition, reward, max_future_state)
+
+    def apply_update(self, transition, reward, max_future_value):
+        """
+        Applies the Q-learning update to the value of the given transition, given its reward and
+        the best value out of the state it led to (None if the game ended or that state has no
+        known transitions).
+        """
+        self.state_visits[transition[0]] = self.state_visits.get(transition[0], 0) + 1
+
+        if max_future_value is not None:
+            self.transitions[transition] = self.transitions[transition] + self.learning_rate * (reward + self.discount_factor * max_future_value - self.transitions[transition])
+        else:
+            self.transitions[transition] = self.transitions[transition] + self.learning_rate * reward
+
+    def replay_experience(self):
+        """
+        Samples a minibatch from the replay buffer and applies the Q-learning update for all
+        of it at once.  Every update in the minibatch is computed from the values the
+        transitions had before the minibatch, and updates to the same transition are summed.
+        """
+        start_states, end_states, rewards, next_states, game_overs = self.replay_buffer.sample(self.replay_batch_size)
+        start_states = [tuple(state) for state in start_states.tolist()]
+        end_states = [tuple(state) for state in end_states.tolist()]
+        next_states = [tuple(state) for state in next_states.tolist()]
+
+        # The best value out of each of the next states, kept by the Transition_Table
+        max_future_values = {}
+        for state in next_states:
+            if state not in max_future_values:
+                max_future_value = self.transitions.get_start_state_max(state)
+                if max_future_value is None:
+                    max_future_value = float("-inf")
+                max_future_values[state] = max_future_value
+
+        unique_transitions = {}
+        transition_indices = np.array([unique_transitions.setdefault(transition, len(unique_transitions))
+                                       for transition in zip(start_states, end_states)])
+        values = np.array([self.transitions[transition] for transition in unique_transitions], dtype=np.float64)
+        future_values = np.array([max_future_values[state] for state in next_states])
+
+        has_future = np.logical_and(np.logical_not(game_overs), future_values != float("-inf"))
+        future_values[np.logical_not(has_future)] = 0
+        current_values = values[transition_indices]
+        updates = np.where(has_future,
+                           self.learning_rate * (rewards + self.discount_factor * future_values - current_values),
+                           self.learning_rate * rewards)
+
+        np.add.at(values, transition_indices, updates)
+        for transition, value in zip(unique_transitions, values.tolist()):
+            self.transitions[transition] = value
+
     def game_completed(self):
         """
         Update self.transitions with a completed game before the board
         is cleared.
         """
+        if not self.training:
+            return
+
         cur_state = self.get_states_from_boards_spots([self.board.spots])[0]
         transition = (self.pre_last_move_state, self.post_last_move_state)
 
-        self.transitions[transition] = self.transitions[transition] + self.learning_rate * reward_function(transition[0], cur_state)
+        self.update_transition(transition, cur_state, True)
 
         self.pre_last_move_state = None
         self.post_last_move_state = None
@@ -149,27 +277,31 @@ class Q_Learning_AI(Player):
         Get an array of of information about the dictionary self.transitions .
         It returns the information in the form:
         [num_transitions, num_start_of_transitions, avg_value, max_value, min_value]
-        
+
         NOTES:
-        1) Should use a dictionary here so this runs much faster 
-        """
-        start_of_transitions = {}
-        max_value = float("-inf")
-        min_value = float("inf")
-        total_value = 0
-        for k, v in self.transitions.items():
-            if start_of_transitions.get(k[0]) is None:
-                start_of_transitions.update({k[0]: 0})
-                # if k[0] not in start_of_transitions:
-                # start_of_transitions.append(k[0])
-            if v > max_value:
-                max_value = v
-            if v < min_value:
-                min_value = v
-            total_value = total_value + v
-
-        return [len(self.transitions), len(start_of_transitions), float(total_value / len(self.transitions)), max_value,
-                min_value]
+        1) These are all kept up to date by the Transition_Table as it's written to,
+        so this doesn't depend on the number of transitions
+        """
+        if len(self.transitions) == 0:
+            return [0, 0, 0, None, None]
+
+        return [len(self.transitions), len(self.transitions.start_state_values),
+                float(self.transitions.total_value / len(self.transitions)), self.transitions.get_max_value(),
+                self.transitions.get_min_value()]
+
+    def get_transition_value_histogram(self):
+        """
+        Gets a histogram of the values of the transitions in the form:
+        [[bin1_start, count1], [bin2_start, count2], ...]
+        """
+        return self.transitions.get_histogram()
+
+    def get_state_visit_counts(self):
+        """
+        Gets a dictionary mapping each state the AI has moved from while training to the
+        number of times it has done so.
+        """
+        return self.state_visits
 
     def print_transition_information(self, info):
         """
@@ -194,12 +326,13 @@ class Q_Learning_AI(Player):
         Loads transitions information from a desired json file.
         """
         with open(file_name, 'r') as fp:
-            self.transitions = {literal_eval(k): v for k, v in json.load(fp).items()}
+            self.transitions = Transition_Table((literal_eval(k), v) for k, v in json.load(fp).items())
 
-    def get_optimal_potential_value(self, depth):
+    def get_optimal_potential_value(self, depth, state=None):
         """
         Look ahead a given number of moves and return the maximal value associated 
-        with a move of that depth. 
+        with a move of that depth.  If no state is given, the state of the current
+        board configuration is used.
         
         STRATEGY:
         1) Look forward in (actual) own transition states.  
@@ -215,14 +348,62 @@ class Q_Learning_AI(Player):
         1) depth is not actually looking ahead in possible moves, but actually simulating something similar (hopefully similar)
         2) ONLY WORKS FOR DEPTH OF 1 RIGHT NOW
         """
-        answer = float("-inf")
+        if state is None:
+            cur_state = self.get_states_from_boards_spots([self.board.spots])[0]
+        else:
+            cur_state = state
+        return self.transitions.get_start_state_max(cur_state)
+
+    def get_transition_values(self, cur_state, possible_state_array, initial_transition_value=10):
+        """
+        Gets the values of the transitions from cur_state to each of the given states without
+        adding any unknown transitions, which are given the initial transition value.
+        """
+        if self.shared_transitions is not None:
+            return self.shared_transitions.get_values(cur_state, possible_state_array, initial_transition_value).tolist()
+        return [self.transitions.get((cur_state, state), initial_transition_value) for state in possible_state_array]
+
+    def get_inference_move(self):
+        """
+        Gets the desired next move from the AI when it's not training.  Nothing is written
+        to the transitions.
+        """
+        possible_next_moves = self.board.get_possible_next_moves()
+        possible_next_states = self.get_states_from_boards_spots(self.board.get_potential_spots_from_moves(possible_next_moves))
+
+        if random.random() < self.random_move_probability:
+            distinct_states = list(dict.fromkeys(possible_next_states))
+            desired_state = distinct_states[random.randint(0, len(distinct_states) - 1)]
+        else:
+            cur_state = self.get_states_from_boards_spots([self.board.spots])[0]
+            values = self.get_transition_values(cur_state, possible_next_states)
+            desired_state = possible_next_states[values.index(max(values))]
+
+        considered_moves = [possible_next_moves[j] for j in range(len(possible_next_states))
+                            if possible_next_states[j] == desired_state]
+        return considered_moves[random.randint(0, len(considered_moves) - 1)]
+
+    def get_move_distribution(self):
+        """
+        Gets the probability of each possible move being made by get_inference_move, in the form:
+        [[move1, probability1], [move2, probability2], ...]
+        """
+        possible_next_moves = self.board.get_possible_next_moves()
+        possible_next_states = self.get_states_from_boards_spots(self.board.get_potential_spots_from_moves(possible_next_moves))
+
         cur_state = self.get_states_from_boards_spots([self.board.spots])[0]
-        for k, v in self.transitions.items():
-            if v > answer and k[0] == cur_state:
-                answer = v
+        values = self.get_transition_values(cur_state, possible_next_states)
+        desired_state = possible_next_states[values.index(max(values))]
+
+        num_distinct_states = len(set(possible_next_states))
+        answer = []
+        for j in range(len(possible_next_moves)):
+            num_same_state = possible_next_states.count(possible_next_states[j])
+            probability = self.random_move_probability / (num_distinct_states * num_same_state)
+            if possible_next_states[j] == desired_state:
+                probability = probability + (1 - self.random_move_probability) / num_same_state
+            answer.append([possible_next_moves[j], probability])
 
-        if answer == float("-inf"):
-            return None
         return answer
 
     def get_next_move(self):  # , new_board):
@@ -233,15 +414,14 @@ class Q_Learning_AI(Player):
         PRECONDITIONS:
         1)  The board exists and is legal
         """
+        if not self.training:
+            return self.get_inference_move()
+
         if self.pre_last_move_state is not None:  # %%%%%%%%%%%%%%%%%%%%%%% FOR (1)
             cur_state = self.get_states_from_boards_spots([self.board.spots])[0]
 
             transition = (self.pre_last_move_state, self.post_last_move_state)
-            try:  # self.transitions.get(transition) is not None:#%%%%%%%%%%%%%%%%%%%%%%%%%%%% FOR (1)
-                max_future_state = self.get_optimal_potential_value(1)
-                self.transitions[transition] = self.transitions[transition] + self.learning_rate * (reward_function(transition[0], cur_state) + self.discount_factor * max_future_state - self.transitions[transition])
-            except:  # %%%%%%%%%%%%%%%%%%%%%%%%%%%% FOR (1)
-                self.transitions[transition] = self.transitions[transition] + self.learning_rate * (reward_function(transition[0], cur_state))
+            self.update_transition(transition, cur_state)
 
         self.pre_last_move_state = self.get_states_from_boards_spots([self.board.spots])[0]  # %%%%%%%%%%%% FOR (1)
 
@@ -265,10 +445,21 @@ class Q_Learning_AI(Player):
         return considered_moves[random.randint(0, len(considered_moves) - 1)]
 
 
+class Search_Timeout(Exception):
+    """
+    Raised inside Alpha_beta's search when its move deadline has passed.
+    """
+    pass
+
+
 class Alpha_beta(Player):
     """
     A class representing a checkers playing AI using Alpha-Beta pruning.
 
+    NOTES:
+    -When given a move deadline (see Player.set_move_deadline), it searches depth 1, 2, ...
+    up to its depth, and makes the move of the deepest search finished before the deadline.
+
     TO DO:
     1) Be able to take in any reward function (for when not win/loss)
     so that you can make a more robust set of training AI
@@ -287,6 +478,8 @@ class Alpha_beta(Player):
         A method implementing alpha-beta pruning to decide what move to make given
         the current board configuration.
         """
+        if self.move_deadline is not None and time.perf_counter() > self.move_deadline:
+            raise Search_Timeout()
         if board.is_game_over():
             if get_number_of_pieces_and_kings(board.spots, board.player_turn) == [0, 0]:
                 if maximizing_player:
@@ -314,7 +507,7 @@ class Alpha_beta(Player):
         if maximizing_player:
             v = float('-inf')
             for j in range(len(potential_spots)):
-                cur_board = Board(potential_spots[j], not board.player_turn)
+                cur_board = Board(old_spots=potential_spots[j], the_player_turn=not board.player_turn)
                 alpha_beta_results = self.alpha_beta(cur_board, depth - 1, alpha, beta, False)
                 if v < alpha_beta_results[0]:
                     v = alpha_beta_results[0]
@@ -328,7 +521,7 @@ class Alpha_beta(Player):
         else:
             v = float('inf')
             for j in range(len(potential_spots)):
-                cur_board = Board(potential_spots[j], not board.player_turn)
+                cur_board = Board(old_spots=potential_spots[j], the_player_turn=not board.player_turn)
                 alpha_beta_results = self.alpha_beta(cur_board, depth - 1, alpha, beta, True)
                 if v > alpha_beta_results[0]:
                     v = alpha_beta_results[0]
@@ -341,138 +534,189 @@ class Alpha_beta(Player):
             return v, possible_moves[desired_move_index]
 
     def get_next_move(self):
-        return self.alpha_beta(self.board, self.depth, float('-inf'), float('inf'), self.player_id)[1]
+        if self.move_deadline is None:
+            return self.alpha_beta(self.board, self.depth, float('-inf'), float('inf'), self.player_id)[1]
+
+        best_move = None
+        for depth in range(1, self.depth + 1):
+            try:
+                best_move = self.alpha_beta(self.board, depth, float('-inf'), float('inf'), self.player_id)[1]
+            except Search_Timeout:
+                break
+        if best_move is None:
+            return self.board.get_possible_next_moves()[0]
+        return best_move
 
 
-def play_n_games(player1, player2, num_games, move_limit):
+def play_n_games(player1, player2, num_games, move_limit, hooks=None, draw_rules=None, time_control=None):
     """
     Plays a specified amount of games of checkers between player1, who goes first,
     and player2, who goes second.  The games will be stopped after the given limit on moves.
     This function outputs an array of arrays formatted as followed (only showing game 1's info):
     [[game1_outcome, num_moves, num_own_pieces, num_opp_pieces, num_own_kings, num_opp_kings]...]
-    gameN_outcome is 0 if player1 won, 1 if lost, 2 if tied, and 3 if hit move limit.
+    gameN_outcome is 0 if player1 won, 1 if lost, 2 if tied, 3 if hit move limit, and 4 if
+    drawn by a rule.
+
+    hooks is an optional list of Game_Hook objects to be told about the events of each game
+    (e.g. a Board_Printing_Hook to print the board after every move), draw_rules an optional
+    Draw_Rules used to end games early, and time_control an optional Time_Control giving the
+    players deadlines and recording how long their moves take.
     
     PRECONDITIONS:
     1)Both player1 and player2 inherit the Player class
     2)Both player1 and player2 play legal moves only
     """
+    return list(iterate_n_games(player1, player2, num_games, move_limit, hooks, draw_rules, time_control))
+
+
+def iterate_n_games(player1, player2, num_games, move_limit, hooks=None, draw_rules=None, time_control=None):
+    """
+    Plays the same games as play_n_games, but yields each game's information as soon as the
+    game is over instead of returning them all at the end.
+    """
     game_board = Board()
     player1.set_board(game_board)
     player2.set_board(game_board)
 
-    players_move = player1
-    outcome_counter = [[-1, -1, -1, -1, -1, -1] for j in range(num_games)]
     for j in range(num_games):
-        # print(j)
-        move_counter = 0
-        while not game_board.is_game_over() and move_counter < move_limit:
-            game_board.make_move(players_move.get_next_move())
-
-            move_counter = move_counter + 1
-            if players_move is player1:
-                value = players_move.value_iteration()
-                print(value)
-                # print(players_move.calculate_policy(value))
-                players_move = player2
-            else:
-                players_move = player1
+        yield play_game(player1, player2, game_board, move_limit, hooks, draw_rules, time_control)
+
+
+def play_game(player1, player2, game_board, move_limit, hooks=None, draw_rules=None, time_control=None):
+    """
+    Plays one game of checkers on the given board between player1, who goes first, and
+    player2, starting from the starting board configuration.  Both players are notified when
+    the game ends, and the game's information is returned in the format used by play_n_games.
 
-            print(game_board.print_board())
+    PRECONDITIONS:
+    1)Both player1 and player2 have been given game_board
+    """
+    game_board.reset_board()
+    game_board.player_turn = True
+
+    if draw_rules is not None:
+        draw_rules.reset(game_board)
+    if time_control is not None:
+        time_control.reset()
+    if hooks:
+        for hook in hooks:
+            hook.game_started(game_board)
+
+    players_move = player1
+    move_counter = 0
+    adjudicated_outcome = None
+    while not game_board.is_game_over() and move_counter < move_limit:
+        if hooks:
+            for hook in hooks:
+                hook.before_move(game_board, players_move)
+        if time_control is not None:
+            time_control.start_move(game_board, players_move)
+        move = players_move.get_next_move()
+        if time_control is not None:
+            adjudicated_outcome = time_control.end_move(game_board, players_move)
+            if adjudicated_outcome is not None:
+                break
+        game_board.make_move(move)
+        if hooks:
+            for hook in hooks:
+                hook.after_move(game_board, players_move, move)
+
+        move_counter = move_counter + 1
+        if players_move is player1:
+            players_move = player2
         else:
-            piece_counter = get_number_of_pieces_and_kings(game_board.spots)
-            if piece_counter[0] != 0 or piece_counter[2] != 0:
-                if piece_counter[1] != 0 or piece_counter[3] != 0:
-                    if move_counter == move_limit:
-                        outcome_counter[j][0] = 3
-                    else:
-                        outcome_counter[j][0] = 2
-                        #                     if (j+1)%100==0:
-                        #                         print("Tie game for game #" + str(j + 1) + " in " + str(move_counter) + " turns!")
-                else:
-                    outcome_counter[j][0] = 0
-                    #                     if (j+1)%100==0:
-                    #                         print("Player 1 won game #" + str(j + 1) + " in " + str(move_counter) + " turns!")
-            else:
-                outcome_counter[j][0] = 1
-            # if (j+1)%100==0:
-            #                     print("Player 2 won game #" + str(j + 1) + " in " + str(move_counter) + " turns!")
+            players_move = player1
 
-            outcome_counter[j][1] = move_counter
-            outcome_counter[j][2] = piece_counter[0]
-            outcome_counter[j][3] = piece_counter[1]
-            outcome_counter[j][4] = piece_counter[2]
-            outcome_counter[j][5] = piece_counter[3]
+        if draw_rules is not None:
+            adjudicated_outcome = draw_rules.update(game_board, move)
+            if adjudicated_outcome is not None:
+                break
 
-            player1.game_completed()
-            player2.game_completed()
-            # game_board.print_board()
-            game_board.reset_board()
+    outcome = get_game_outcome(game_board, move_counter, move_limit, adjudicated_outcome)
+    if hooks:
+        for hook in hooks:
+            hook.game_ended(game_board, outcome)
+    player1.game_completed()
+    player2.game_completed()
+    return outcome
 
-    return outcome_counter
+
+def get_game_outcome(game_board, move_counter, move_limit, adjudicated_outcome=None):
+    """
+    Gets the information about a finished game in the format used by play_n_games:
+    [game_outcome, num_moves, num_own_pieces, num_opp_pieces, num_own_kings, num_opp_kings]
+    game_outcome is 0 if player1 won, 1 if lost, 2 if tied, 3 if hit move limit, and 4 if
+    drawn by a rule (see Draw_Rules).  If the game was ended early by Draw_Rules or a
+    Time_Control forfeit, the outcome it gave is used.
+    """
+    piece_counter = get_number_of_pieces_and_kings(game_board.spots)
+    if adjudicated_outcome is not None:
+        game_outcome = adjudicated_outcome
+    elif piece_counter[0] != 0 or piece_counter[2] != 0:
+        if piece_counter[1] != 0 or piece_counter[3] != 0:
+            if move_counter == move_limit:
+                game_outcome = 3
+            else:
+                game_outcome = 2
+        else:
+            game_outcome = 0
+    else:
+        game_outcome = 1
+
+    return [game_outcome, move_counter, piece_counter[0], piece_counter[1], piece_counter[2], piece_counter[3]]
 
 
 def pretty_outcome_display(outcomes):
     """
-    Prints the outcome of play_n_games in a easy to understand format.
+    Prints the outcome of play_n_games in a easy to understand format.  Also takes an
+    Outcome_Statistics kept while the games were played.
     
     TO DO:
     1) Add functionality for pieces in each game
     2) Add ability to take other strings for AI info and display it
     """
-    game_wins = [0, 0, 0, 0]
-    total_moves = 0
-    max_moves_made = float("-inf")
-    min_moves_made = float("inf")
-    for outcome in outcomes:
-        total_moves = total_moves + outcome[1]
-        if outcome[1] < min_moves_made:
-            min_moves_made = outcome[1]
-        if outcome[1] > max_moves_made:
-            max_moves_made = outcome[1]
-
-        game_wins[outcome[0]] = game_wins[outcome[0]] + 1
-
-    print("Games Played: ".ljust(35), len(outcomes))
-    print("Player 1 wins: ".ljust(35), game_wins[0])
-    print("Player 2 wins: ".ljust(35), game_wins[1])
-    print("Games exceeded move limit: ".ljust(35), game_wins[3])
-    print("Games tied: ".ljust(35), game_wins[2])
-    print("Total moves made: ".ljust(35), total_moves)
-    print("Average moves made: ".ljust(35), total_moves / len(outcomes))
-    print("Max moves made: ".ljust(35), max_moves_made)
-    print("Min moves made: ".ljust(35), min_moves_made)
+    if isinstance(outcomes, Outcome_Statistics):
+        statistics = outcomes
+    else:
+        statistics = Outcome_Statistics()
+        statistics.add_all(outcomes)
+
+    print("Games Played: ".ljust(35), statistics.num_games)
+    print("Player 1 wins: ".ljust(35), statistics.outcome_counts[0])
+    print("Player 2 wins: ".ljust(35), statistics.outcome_counts[1])
+    print("Games exceeded move limit: ".ljust(35), statistics.outcome_counts[3])
+    print("Games tied: ".ljust(35), statistics.outcome_counts[2])
+    print("Games drawn by rule: ".ljust(35), statistics.outcome_counts[4])
+    print("Total moves made: ".ljust(35), statistics.total_moves)
+    print("Average moves made: ".ljust(35), statistics.get_average_moves())
+    print("Max moves made: ".ljust(35), statistics.max_moves_made)
+    print("Min moves made: ".ljust(35), statistics.min_moves_made)
 
 
 def plot_end_game_information(outcome, interval, title="End of Game Results"):
     """
+    Plots how often each outcome happened in every group of interval games.  Also takes an
+    Outcome_Statistics which was given the same interval.
     """
-    player1_wins = [0 for _ in range(int(len(outcome) / interval))]
-    player2_wins = [0 for _ in range(int(len(outcome) / interval))]
-    ties = [0 for _ in range(int(len(outcome) / interval))]
-    move_limit = [0 for _ in range(int(len(outcome) / interval))]
-
-    for j in range(int(len(outcome) / interval)):
-        for i in range(interval):
-            if outcome[j * interval + i][0] == 0:
-                player1_wins[j] = player1_wins[j] + 1
-            elif outcome[j * interval + i][0] == 1:
-                player2_wins[j] = player2_wins[j] + 1
-            elif outcome[j * interval + i][0] == 2:
-                ties[j] = ties[j] + 1
-            else:
-                move_limit[j] = move_limit[j] + 1
+    import matplotlib.pyplot as plt
+
+    if isinstance(outcome, Outcome_Statistics):
+        interval_counts = outcome.get_interval_counts()
+    else:
+        interval_counts = get_interval_counts(outcome, interval)
 
     plt.figure(title)
 
-    p1_win_graph, = plt.plot(player1_wins, label="Player 1 wins")
-    p2_win_graph, = plt.plot(player2_wins, label="Player 2 wins")
-    tie_graph, = plt.plot(ties, label="Ties")
-    move_limit_graph, = plt.plot(move_limit, label="Move limit reached")
+    p1_win_graph, = plt.plot(interval_counts[:, 0], label="Player 1 wins")
+    p2_win_graph, = plt.plot(interval_counts[:, 1], label="Player 2 wins")
+    tie_graph, = plt.plot(interval_counts[:, 2], label="Ties")
+    move_limit_graph, = plt.plot(interval_counts[:, 3], label="Move limit reached")
+    drawn_by_rule_graph, = plt.plot(interval_counts[:, 4], label="Drawn by rule")
 
     plt.ylabel("Occurance per " + str(interval) + " games")
     plt.xlabel("Interval")
 
-    plt.legend(handles=[p1_win_graph, p2_win_graph, tie_graph, move_limit_graph])
+    plt.legend(handles=[p1_win_graph, p2_win_graph, tie_graph, move_limit_graph, drawn_by_rule_graph])
 
 
 def get_number_of_pieces_and_kings(spots, player_id=None):
@@ -508,18 +752,27 @@ ALPHA_BETA_DEPTH = 2
 TRAINING_MOVE_LIMIT = 500
 VALIDATION_MOVE_LIMIT = 1000
 TESTING_MOVE_LIMIT = 2000
-# PLAYER1 = Q_Learning_AI(True, LEARNING_RATE, DISCOUNT_FACTOR,
-#                         the_random_move_probability=TRAINING_RANDOM_MOVE_PROBABILITY)  # , info_location="data.json")
-PLAYER2 = Alpha_beta(False, 2, ALPHA_BETA_DEPTH)
-# PLAYER3 = Alpha_beta(False, 1)
-# PLAYER4 = Alpha_beta(False, 2, 3)
-# PLAYER5 = Q_Learning_AI(False, LEARNING_RATE, DISCOUNT_FACTOR, the_random_move_probability=TRAINING_RANDOM_MOVE_PROBABILITY)
-PLAYER1 = Value_Iteration_AI(opponent=PLAYER2)
-# PLAYER2 = Value_Iteration_AI(player_id=2)
-
-# PLAYER1.print_transition_information(PLAYER1.get_transitions_information())
 
 def run():
+    """
+    Plays the experiment set up by the constants above.  The players are only built (and
+    plotting only loaded) here, so importing this module doesn't do any work.  See
+    Checkers_CLI for running matches, training and tournaments from the command line.
+    """
+    import matplotlib.pyplot as plt
+    from Value_Iteration_AI import Value_Iteration_AI
+
+    # PLAYER1 = Q_Learning_AI(True, LEARNING_RATE, DISCOUNT_FACTOR,
+    #                         the_random_move_probability=TRAINING_RANDOM_MOVE_PROBABILITY)  # , info_location="data.json")
+    PLAYER2 = Alpha_beta(False, ALPHA_BETA_DEPTH)
+    # PLAYER3 = Alpha_beta(False, 1)
+    # PLAYER4 = Alpha_beta(False, 3)
+    # PLAYER5 = Q_Learning_AI(False, LEARNING_RATE, DISCOUNT_FACTOR, the_random_move_probability=TRAINING_RANDOM_MOVE_PROBABILITY)
+    PLAYER1 = Value_Iteration_AI(opponent=PLAYER2)
+    # PLAYER2 = Value_Iteration_AI(player_id=2)
+
+    # PLAYER1.print_transition_information(PLAYER1.get_transitions_information())
+
     training_info = []
     validation_info = []
     for j in range(NUM_TRAINING_ROUNDS):
@@ -0,0 +1,410 @@
+"""
+A simulator which plays a large number of games of checkers in lockstep, with the
+positions of every game held in one NumPy array, so that move generation and
+make_move are done for all of the unfinished games at once.
+
+Each square of a position is numbered row * 4 + column (as in Board.pack_move), and
+holds the same piece values as Board.spots.
+
+NOTES:
+-The rules (and the order in which moves are listed) are the same as Board's, so a
+policy which picks the n-th move picks the same move Board.get_possible_next_moves
+would have given as the n-th.
+-Every game starts with player 1's turn and a game only stops when it's over, so all of
+the unfinished games always have the same player to move.
+-A policy is any callable taking (positions, player_turn, moves) and returning, for each of
+the games, the index of the chosen move amongst that game's moves.  moves is in the
+form returned by get_possible_next_moves.
+"""
+
+import numpy as np
+
+from Board import Board
+
+NUM_SQUARES = 32
+# The longest possible move is a piece capturing all 12 opposing pieces
+MAX_MOVE_LENGTH = 13
+# Used in place of a square which isn't on the board
+OFF_BOARD = NUM_SQUARES
+
+
+def build_direction_tables():
+    """
+    Gets the squares one and two steps away from every square in each direction, in the form:
+    [neighbours, jumps]
+    where directions 0 and 1 are forwards (as player 1 moves) and 2 and 3 are backwards, in the
+    order Board lists them.  Squares off the board are OFF_BOARD.
+    """
+    board = Board()
+    neighbours = np.full((NUM_SQUARES + 1, 4), OFF_BOARD, dtype=np.int64)
+    jumps = np.full((NUM_SQUARES + 1, 4), OFF_BOARD, dtype=np.int64)
+    for square in range(NUM_SQUARES):
+        location = [square // board.WIDTH, square % board.WIDTH]
+        steps = board.forward_n_locations(location, 1) + board.forward_n_locations(location, 1, True)
+        double_steps = board.forward_n_locations(location, 2) + board.forward_n_locations(location, 2, True)
+        for direction in range(4):
+            if len(steps[direction]) != 0:
+                neighbours[square, direction] = steps[direction][0] * board.WIDTH + steps[direction][1]
+            if len(double_steps[direction]) != 0:
+                jumps[square, direction] = double_steps[direction][0] * board.WIDTH + double_steps[direction][1]
+
+    return [neighbours, jumps]
+
+
+NEIGHBOURS, JUMPS = build_direction_tables()
+
+# ALLOWED_DIRECTIONS[piece] is which directions a piece can move in
+ALLOWED_DIRECTIONS = np.array([[False, False, False, False],
+                               [True, True, False, False],
+                               [False, False, True, True],
+                               [True, True, True, True],
+                               [True, True, True, True]])
+
+# PROMOTIONS[piece, square] is what a piece becomes when it ends a move on a square
+PROMOTIONS = np.tile(np.arange(5, dtype=np.int8)[:, None], (1, NUM_SQUARES + 1))
+PROMOTIONS[Board.P1, NUM_SQUARES - 4:NUM_SQUARES] = Board.P1_K
+PROMOTIONS[Board.P2, 0:4] = Board.P2_K
+
+# The base 5 place value of each jump in the number used to order a piece's captures
+ORDER_PLACES = 5 ** np.arange(MAX_MOVE_LENGTH - 2, -1, -1, dtype=np.int64)
+
+EDGE_SQUARES = np.array([(square % 4 == 0 and (square // 4) % 2 == 0) or
+                         (square % 4 == 3 and (square // 4) % 2 == 1) for square in range(NUM_SQUARES)])
+SQUARE_ROWS = np.arange(NUM_SQUARES) // 4
+
+
+def get_positions_from_spots(spots, num_games=1):
+    """
+    Gets an array holding num_games copies of the given board spots.
+    """
+    return np.tile(np.array(spots, dtype=np.int8).reshape(1, NUM_SQUARES), (num_games, 1))
+
+
+def get_spots_from_position(position):
+    """
+    Gets the board spots (as used by Board) of one position.
+    """
+    return np.asarray(position).reshape(8, 4).tolist()
+
+
+def get_possible_next_moves(positions, player_turn):
+    """
+    Gets the possible moves in each of the given positions with the given player to move, in the form:
+    [move_games, paths, captures, offsets]
+    where the moves of game j are offsets[j] to offsets[j + 1], paths[k] is the squares move k
+    goes through (padded with -1), and captures[k] is a bit mask of the squares it captures on.
+    """
+    positions = np.asarray(positions)
+    num_games = len(positions)
+    padded = np.concatenate((positions, np.full((num_games, 1), -1, dtype=positions.dtype)), axis=1)
+    own = (padded > 0) & ((padded % 2 == 1) == player_turn)
+    opponent = (padded > 0) & np.logical_not(own)
+    empty = padded == 0
+
+    # Every piece starts as a capture of length 0, and the frontier is extended one jump at a time
+    games, origins = np.nonzero(own[:, :NUM_SQUARES])
+    pieces = positions[games, origins]
+    squares = origins
+    captured = np.zeros(len(games), dtype=np.int64)
+    paths = np.full((len(games), MAX_MOVE_LENGTH), -1, dtype=np.int8)
+    paths[:, 0] = origins
+    orders = np.zeros(len(games), dtype=np.int64)
+
+    capture_moves = []
+    for length in range(1, MAX_MOVE_LENGTH):
+        if len(games) == 0:
+            break
+        next_squares = NEIGHBOURS[squares]
+        landing_squares = JUMPS[squares]
+        next_captured = (captured[:, None] >> next_squares) & 1 == 1
+        landing_captured = (captured[:, None] >> landing_squares) & 1 == 1
+
+        can_jump = ALLOWED_DIRECTIONS[pieces] & (landing_squares != OFF_BOARD) & \
+            opponent[games[:, None], next_squares] & np.logical_not(next_captured) & \
+            (empty[games[:, None], landing_squares] | (landing_squares == origins[:, None]) | landing_captured)
+        if length > 1:
+            # A piece which has just been crowned ends its move
+            can_jump[PROMOTIONS[pieces, squares] != pieces] = False
+            finished = np.logical_not(np.any(can_jump, axis=1))
+            capture_moves.append([games[finished], paths[finished], captured[finished], orders[finished]])
+
+        entries, directions = np.nonzero(can_jump)
+        games = games[entries]
+        origins = origins[entries]
+        pieces = pieces[entries]
+        squares = landing_squares[entries, directions]
+        captured = captured[entries] | (np.int64(1) << next_squares[entries, directions])
+        paths = paths[entries]
+        paths[:, length] = squares
+        orders = orders[entries] + (directions + 1) * ORDER_PLACES[length - 1]
+
+    if len(capture_moves) != 0:
+        move_games, paths, captures, orders = [np.concatenate(parts) for parts in zip(*capture_moves)]
+    else:
+        move_games = np.zeros(0, dtype=np.int64)
+        paths = np.zeros((0, MAX_MOVE_LENGTH), dtype=np.int8)
+        captures = np.zeros(0, dtype=np.int64)
+        orders = np.zeros(0, dtype=np.int64)
+
+    # Games without any captures get their simple moves
+    has_capture = np.zeros(num_games, dtype=np.bool_)
+    has_capture[move_games] = True
+    can_move = own[:, :NUM_SQUARES, None] & ALLOWED_DIRECTIONS[positions] & \
+        empty[np.arange(num_games)[:, None, None], NEIGHBOURS[None, :NUM_SQUARES]] & \
+        np.logical_not(has_capture)[:, None, None]
+    simple_games, simple_origins, directions = np.nonzero(can_move)
+    simple_paths = np.full((len(simple_games), MAX_MOVE_LENGTH), -1, dtype=np.int8)
+    simple_paths[:, 0] = simple_origins
+    simple_paths[:, 1] = NEIGHBOURS[simple_origins, directions]
+
+    move_games = np.concatenate((move_games, simple_games))
+    paths = np.concatenate((paths, simple_paths))
+    captures = np.concatenate((captures, np.zeros(len(simple_games), dtype=np.int64)))
+    orders = np.concatenate((orders, (directions + 1) * ORDER_PLACES[0]))
+
+    order = np.lexsort((orders, paths[:, 0], move_games))
+    move_games = move_games[order]
+    offsets = np.searchsorted(move_games, np.arange(num_games + 1))
+
+    return [move_games, paths[order], captures[order], offsets]
+
+
+def get_move_destinations(paths):
+    """
+    Gets the square each of the given move paths ends on.
+    """
+    return paths[np.arange(len(paths)), np.sum(paths >= 0, axis=1) - 1].astype(np.int64)
+
+
+def make_moves(positions, paths, captures):
+    """
+    Makes one move in each of the given positions (in place), with paths and captures being
+    the chosen moves' entries from get_possible_next_moves.
+    """
+    games = np.arange(len(positions))
+    origins = paths[:, 0].astype(np.int64)
+    destinations = get_move_destinations(paths)
+    pieces = positions[games, origins]
+
+    captured_squares = (captures[:, None] >> np.arange(NUM_SQUARES)) & 1 == 1
+    positions[captured_squares] = Board.EMPTY_SPOT
+    positions[games, origins] = Board.EMPTY_SPOT
+    positions[games, destinations] = PROMOTIONS[pieces, destinations]
+
+
+def get_states_from_positions(positions, player_id):
+    """
+    Gets the state characteristics (as made by Q_Learning_AI.get_states_from_boards_spots for a player
+    with the given player_id) of each of the given positions, as an array with one row per position.
+    """
+    positions = np.asarray(positions)
+    piece_counts = np.stack([np.sum(positions == piece, axis=1) for piece in range(1, 5)], axis=1)
+    if player_id:
+        own = (positions == Board.P1) | (positions == Board.P1_K)
+    else:
+        own = (positions == Board.P2) | (positions == Board.P2_K)
+    other = (positions != Board.EMPTY_SPOT) & np.logical_not(own)
+
+    p1_pieces = piece_counts[:, 0] + piece_counts[:, 2]
+    p2_pieces = piece_counts[:, 1] + piece_counts[:, 3]
+    own_rows = np.sum(own * SQUARE_ROWS, axis=1)
+    other_rows = np.sum(other * SQUARE_ROWS, axis=1)
+
+    answer = np.zeros((len(positions), 7), dtype=np.int64)
+    answer[:, 0:4] = piece_counts
+    answer[:, 4] = np.sum(own & EDGE_SQUARES, axis=1)
+    answer[:, 5] = np.where(p1_pieces != 0, own_rows // np.maximum(p1_pieces, 1), 0)
+    answer[:, 6] = np.where(p2_pieces != 0, other_rows // np.maximum(p2_pieces, 1), 0)
+    return answer
+
+
+def choose_in_segments(scores, offsets):
+    """
+    Gets the index (within its segment) of the highest score in each segment offsets[j] to
+    offsets[j + 1], picking the first on ties.  Every segment must be non-empty.
+    """
+    best = np.maximum.reduceat(scores, offsets[:-1])
+    segments = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    best_indices = np.flatnonzero(scores == best[segments])
+    return best_indices[np.searchsorted(best_indices, offsets[:-1])] - offsets[:-1]
+
+
+class Random_Policy:
+    """
+    A policy which picks one of the possible moves uniformly at random.
+    """
+
+    def __init__(self, seed=None):
+        self.random = np.random.default_rng(seed)
+
+    def __call__(self, positions, player_turn, moves):
+        counts = np.diff(moves[3])
+        return np.floor(self.random.random(len(counts)) * counts).astype(np.int64)
+
+
+class Greedy_Policy:
+    """
+    A policy which picks a move capturing the most pieces, breaking ties at random.
+    """
+
+    def __init__(self, seed=None):
+        self.random = np.random.default_rng(seed)
+
+    def __call__(self, positions, player_turn, moves):
+        num_captured = np.sum((moves[2][:, None] >> np.arange(NUM_SQUARES)) & 1, axis=1)
+        return choose_in_segments(num_captured + self.random.random(len(num_captured)), moves[3])
+
+
+class Q_Table_Policy:
+    """
+    A policy which plays like a Q_Learning_AI which isn't training and never makes random moves:
+    it finds the move with the highest valued transition (unknown ones are given
+    initial_transition_value), and then picks at random between the moves leading to the same state.
+
+    The transitions are copied into sorted arrays when the policy is made, so lookups are a
+    binary search for every move at once.
+    """
+
+    def __init__(self, transitions, player_id, initial_transition_value=10, seed=None):
+        self.player_id = player_id
+        self.initial_transition_value = initial_transition_value
+        self.random = np.random.default_rng(seed)
+
+        start_codes = self.encode_states(np.array([k[0] for k in transitions], dtype=np.int64).reshape(-1, 7))
+        end_codes = self.encode_states(np.array([k[1] for k in transitions], dtype=np.int64).reshape(-1, 7))
+        self.start_codes = np.unique(start_codes)
+        self.end_codes = np.unique(end_codes)
+
+        keys = np.searchsorted(self.start_codes, start_codes) * len(self.end_codes) + \
+            np.searchsorted(self.end_codes, end_codes)
+        order = np.argsort(keys)
+        self.keys = keys[order]
+        self.values = np.array(list(transitions.values()), dtype=np.float64)[order]
+
+    def encode_states(self, states):
+        """
+        Packs each row of state characteristics into an integer, using 8 bits per characteristic.
+        """
+        return np.sum(states << (8 * np.arange(6, -1, -1)), axis=1)
+
+    def find_codes(self, known_codes, codes):
+        """
+        Gets the index of each code amongst known_codes, and whether it was there, in the form: [indices, found]
+        """
+        if len(known_codes) == 0:
+            return [np.zeros(len(codes), dtype=np.int64), np.zeros(len(codes), dtype=np.bool_)]
+        indices = np.minimum(np.searchsorted(known_codes, codes), len(known_codes) - 1)
+        return [indices, known_codes[indices] == codes]
+
+    def get_transition_values(self, start_codes, end_codes):
+        """
+        Gets the value of each transition from start_codes[j] to end_codes[j].
+        """
+        start_indices, start_found = self.find_codes(self.start_codes, start_codes)
+        end_indices, end_found = self.find_codes(self.end_codes, end_codes)
+        keys = start_indices * len(self.end_codes) + end_indices
+        answer = np.full(len(keys), self.initial_transition_value, dtype=np.float64)
+        if len(self.keys) != 0:
+            positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+            found = start_found & end_found & (self.keys[positions] == keys)
+            answer[found] = self.values[positions[found]]
+        return answer
+
+    def __call__(self, positions, player_turn, moves):
+        move_games, paths, captures, offsets = moves
+        next_positions = positions[move_games]
+        make_moves(next_positions, paths, captures)
+
+        start_codes = self.encode_states(get_states_from_positions(positions, self.player_id))[move_games]
+        end_codes = self.encode_states(get_states_from_positions(next_positions, self.player_id))
+        values = self.get_transition_values(start_codes, end_codes)
+
+        desired_moves = offsets[:-1] + choose_in_segments(values, offsets)
+        leads_to_desired = end_codes == end_codes[desired_moves][move_games]
+        return choose_in_segments(leads_to_desired + self.random.random(len(values)), offsets)
+
+
+class Batched_Simulator:
+    """
+    A class to play many games between two policies at once, one ply of every unfinished game per step.
+
+    NOTES:
+    -Finished games are left out of every later step, but their final positions are kept.
+    """
+
+    def __init__(self, num_games, move_limit, board=None):
+        """
+        Initializes num_games games, all starting from the given Board's configuration (the starting
+        configuration by default) with player 1 to move.
+        """
+        if board is None:
+            board = Board()
+        self.num_games = num_games
+        self.move_limit = move_limit
+        self.positions = get_positions_from_spots(board.spots, num_games)
+        self.move_counters = np.zeros(num_games, dtype=np.int64)
+        self.active = np.ones(num_games, dtype=np.bool_)
+        self.player_turn = True
+
+    def step(self, policy):
+        """
+        Has the given policy make a move in every unfinished game, and marks the games which
+        are over (or have hit the move limit) as finished.
+        """
+        games = np.flatnonzero(self.active)
+        positions = self.positions[games]
+        moves = get_possible_next_moves(positions, self.player_turn)
+
+        has_moves = np.diff(moves[3]) != 0
+        self.active[games[np.logical_not(has_moves)]] = False
+        if not np.all(has_moves):
+            moves = self.select_games(moves, has_moves)
+            games = games[has_moves]
+            positions = positions[has_moves]
+
+        if len(games) != 0:
+            chosen = moves[3][:-1] + policy(positions, self.player_turn, moves)
+            make_moves(positions, moves[1][chosen], moves[2][chosen])
+            self.positions[games] = positions
+            self.move_counters[games] = self.move_counters[games] + 1
+            self.active[games[self.move_counters[games] >= self.move_limit]] = False
+
+        self.player_turn = not self.player_turn
+
+    def select_games(self, moves, keep):
+        """
+        Gets the moves of only the games where keep is True, in the form returned by get_possible_next_moves.
+        """
+        move_games, paths, captures, offsets = moves
+        keep_moves = keep[move_games]
+        new_games = np.cumsum(keep) - 1
+        counts = np.diff(offsets)[keep]
+        return [new_games[move_games[keep_moves]], paths[keep_moves], captures[keep_moves],
+                np.concatenate(([0], np.cumsum(counts)))]
+
+    def play(self, player1_policy, player2_policy):
+        """
+        Plays every game to the end and returns the outcomes in the format returned by play_n_games,
+        as an array with one row per game.
+        """
+        while np.any(self.active):
+            if self.player_turn:
+                self.step(player1_policy)
+            else:
+                self.step(player2_policy)
+
+        return self.get_outcomes()
+
+    def get_outcomes(self):
+        """
+        Gets the outcomes of the games in the format returned by play_n_games (see get_game_outcome),
+        as an array with one row per game.
+        """
+        piece_counts = np.stack([np.sum(self.positions == piece, axis=1) for piece in range(1, 5)], axis=1)
+        p1_left = piece_counts[:, 0] + piece_counts[:, 2] != 0
+        p2_left = piece_counts[:, 1] + piece_counts[:, 3] != 0
+
+        outcomes = np.where(self.move_counters == self.move_limit, 3, 2)
+        outcomes[np.logical_not(p2_left)] = 0
+        outcomes[np.logical_not(p1_left)] = 1
+        return np.concatenate((outcomes[:, None], self.move_counters[:, None], piece_counts), axis=1)
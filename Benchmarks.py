@@ -0,0 +1,265 @@
+"""
+A benchmark suite with fixed positions and seeds, whose results can be saved as JSON
+baselines and compared against later runs to catch performance regressions, e.g.:
+
+python Benchmarks.py --save baseline.json
+python Benchmarks.py --compare baseline.json --threshold .1
+
+NOTES:
+-Every benchmark is timed over a number of repeats (after one untimed warm up call), and the
+median time of one call is reported along with the fastest.
+-Comparisons use the median, and a benchmark regressed if it got slower by more than the
+threshold (as a fraction of the baseline).  The exit status is 1 if anything regressed.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+
+from Board import Board
+
+# The pieces of the endgame solved by the value iteration benchmark
+ENDGAME_PIECES = [[3, 1, 1], [4, 1, 1], [6, 2, 2]]
+NUM_Q_TABLE_TRANSITIONS = 200000
+
+
+def get_benchmark_positions(seed=0, plies=(0, 12, 24, 40)):
+    """
+    Gets Boards of the positions reached after each of the given numbers of plies of a game of
+    random moves with the given seed, in the form: [[plies, board], ...]
+    """
+    random.seed(seed)
+    board = Board()
+    answer = []
+    for ply in range(max(plies) + 1):
+        if ply in plies:
+            answer.append([ply, Board(old_spots=[row[:] for row in board.spots], the_player_turn=board.player_turn)])
+        moves = board.get_possible_next_moves()
+        if len(moves) == 0:
+            break
+        board.make_move(moves[random.randint(0, len(moves) - 1)])
+    return answer
+
+
+def benchmark_move_generation():
+    boards = [board for _, board in get_benchmark_positions()]
+
+    def run():
+        for board in boards:
+            board.get_possible_next_moves()
+
+    return run
+
+
+def benchmark_make_move():
+    boards = [board for _, board in get_benchmark_positions()]
+    moves = [board.get_possible_next_moves() for board in boards]
+
+    def run():
+        for board, board_moves in zip(boards, moves):
+            original_spots = [row[:] for row in board.spots]
+            for move in board_moves:
+                board.make_move(move, switch_player_turn=False)
+                board.spots = [row[:] for row in original_spots]
+
+    return run
+
+
+def benchmark_potential_spots():
+    boards = [board for _, board in get_benchmark_positions()]
+    moves = [board.get_possible_next_moves() for board in boards]
+
+    def run():
+        for board, board_moves in zip(boards, moves):
+            board.get_potential_spots_from_moves(board_moves)
+
+    return run
+
+
+def benchmark_alpha_beta(depth):
+    from AI import Alpha_beta
+
+    def setup():
+        board = get_benchmark_positions(plies=(12,))[0][1]
+        player = Alpha_beta(board.player_turn, depth, board)
+
+        def run():
+            player.get_next_move()
+
+        return run
+
+    return setup
+
+
+def benchmark_q_learning(training=False):
+    from AI import Q_Learning_AI
+
+    def setup():
+        board = get_benchmark_positions(plies=(12,))[0][1]
+        player = Q_Learning_AI(board.player_turn, .005, .3, the_board=board)
+
+        # Random transitions, plus the ones which can actually be looked up from the position
+        random.seed(0)
+        ranges = [13, 13, 13, 13, 9, 8, 8]
+        transitions = {}
+        while len(transitions) < NUM_Q_TABLE_TRANSITIONS:
+            start = tuple(random.randrange(limit) for limit in ranges)
+            end = tuple(random.randrange(limit) for limit in ranges)
+            transitions[(start, end)] = random.random() * 20 - 10
+        cur_state = player.get_states_from_boards_spots([board.spots])[0]
+        next_states = player.get_states_from_boards_spots(
+            board.get_potential_spots_from_moves(board.get_possible_next_moves()))
+        for state in next_states:
+            transitions[(cur_state, state)] = random.random() * 20 - 10
+        player.transitions.update(transitions)
+        player.set_training(training)
+
+        def run():
+            if training:
+                # So every call also applies the Q-learning update for a previous move
+                player.pre_last_move_state = cur_state
+                player.post_last_move_state = next_states[0]
+            player.get_next_move()
+
+        return run
+
+    return setup
+
+
+def benchmark_value_iteration_sweep():
+    from AI import Alpha_beta
+    from Value_Iteration_AI import Value_Iteration_AI
+
+    board = Board()
+    board.empty_board()
+    board.insert_pieces(ENDGAME_PIECES)
+    player = Value_Iteration_AI(Alpha_beta(False, 1), board=board)
+    player.solver_board.set_spots(player.start_spots)
+    player.prepare_solver()
+    player.build_transition_graph()
+    values = player.states.get_values().copy()
+
+    def run():
+        player.graph.backup_states(values)
+
+    return run
+
+
+def benchmark_play_n_games():
+    from AI import Alpha_beta, Q_Learning_AI, play_n_games
+
+    player1 = Alpha_beta(True, 1)
+    player2 = Q_Learning_AI(False, 0, 0, the_random_move_probability=1)
+    player2.set_training(False)
+
+    def run():
+        random.seed(0)
+        play_n_games(player1, player2, 4, 200)
+
+    return run
+
+
+def get_benchmarks():
+    """
+    Gets the benchmarks of the suite in the form: [[name, setup, repeats], ...]
+    where setup() does any preparation and returns the function to time.
+    """
+    return [["move_generation", benchmark_move_generation, 200],
+            ["make_move", benchmark_make_move, 200],
+            ["get_potential_spots_from_moves", benchmark_potential_spots, 200],
+            ["alpha_beta_depth_2", benchmark_alpha_beta(2), 20],
+            ["alpha_beta_depth_4", benchmark_alpha_beta(4), 5],
+            ["alpha_beta_depth_6", benchmark_alpha_beta(6), 1],
+            ["q_learning_get_next_move", benchmark_q_learning(), 200],
+            ["q_learning_training_get_next_move", benchmark_q_learning(training=True), 200],
+            ["value_iteration_sweep", benchmark_value_iteration_sweep, 50],
+            ["play_n_games", benchmark_play_n_games, 5]]
+
+
+def run_benchmarks(names=None, repeat_scale=1, verbose=True):
+    """
+    Runs the benchmarks with the given names (all of them by default), and gets the results in the form:
+    {name: {"median": seconds, "min": seconds, "repeats": repeats}}
+    """
+    results = {}
+    for name, setup, repeats in get_benchmarks():
+        if names is not None and name not in names:
+            continue
+        repeats = max(1, int(repeats * repeat_scale))
+        function = setup()
+        function()
+
+        times = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start_time)
+
+        results[name] = {"median": statistics.median(times), "min": min(times), "repeats": repeats}
+        if verbose:
+            print(name.ljust(35), "%.6fs" % results[name]["median"])
+    return results
+
+
+def save_results(results, file_name):
+    """
+    Saves benchmark results as a JSON baseline, along with the Python version and platform they were run on.
+    """
+    with open(file_name, 'w') as fp:
+        json.dump({"python": platform.python_version(), "platform": platform.platform(), "results": results},
+                  fp, indent=2)
+
+
+def load_results(file_name):
+    with open(file_name, 'r') as fp:
+        return json.load(fp)["results"]
+
+
+def compare_results(results, baseline, threshold=.1):
+    """
+    Compares benchmark results against a baseline, printing the change in each, and returns the
+    names of the benchmarks which got slower by more than the threshold.
+    """
+    regressions = []
+    for name, info in results.items():
+        if name not in baseline:
+            print(name.ljust(35), "no baseline")
+            continue
+        ratio = info["median"] / baseline[name]["median"]
+        if ratio > 1 + threshold:
+            verdict = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            verdict = "improvement"
+        else:
+            verdict = ""
+        print(name.ljust(35), "%.6fs -> %.6fs" % (baseline[name]["median"], info["median"]),
+              "(%+.1f%%)" % (100 * (ratio - 1)), verdict)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--only", nargs="+", default=None, help="names of the benchmarks to run")
+    parser.add_argument("--repeat-scale", type=float, default=1, help="multiplies the number of repeats")
+    parser.add_argument("--save", default=None, help="file to save the results to as a baseline")
+    parser.add_argument("--compare", default=None, help="baseline file to compare the results with")
+    parser.add_argument("--threshold", type=float, default=.1, help="slowdown (as a fraction) counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, args.repeat_scale)
+    if args.save is not None:
+        save_results(results, args.save)
+    if args.compare is not None:
+        print("")
+        if len(compare_results(results, load_results(args.compare), args.threshold)) != 0:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
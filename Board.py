@@ -22,6 +22,8 @@ class Board:
     P1_K = 3
     P2_K = 4
     BACKWARDS_PLAYER = P2
+    # The piece each piece becomes when the colours are swapped (indexed by piece)
+    SWAPPED_PIECES = [EMPTY_SPOT, P2, P1, P2_K, P1_K]
 
     def __init__(self, height=8, width=4, old_spots=None, the_player_turn=True):
         """
@@ -174,7 +176,7 @@ class Board:
                             if self.get_spot_info(start_loc) != self.P2 or next2[j][0] != 0:
                                 temp_move2 = [start_loc, next2[j]]
 
-                                temp_board = Board(copy.deepcopy(self.spots), self.player_turn)
+                                temp_board = Board(old_spots=copy.deepcopy(self.spots), the_player_turn=self.player_turn)
                                 temp_board.make_move(temp_move2, False)
 
                                 answer.extend(temp_board.get_capture_moves(temp_move2[1], temp_move1))
@@ -379,3 +381,91 @@ class Board:
 
     def switch_turn(self):
         self.player_turn = not self.player_turn
+
+    def get_position_key(self, spots=None, player_turn=None):
+        """
+        Gets a hashable encoding (bytes) of a board configuration and who's turn it is,
+        which is equal for any two equal positions.  If not given, the board's own spots
+        and turn are used.
+        """
+        if spots is None:
+            spots = self.spots
+        if player_turn is None:
+            player_turn = self.player_turn
+        return bytes([element for row in spots for element in row] + [player_turn])
+
+    def get_spots_from_position_key(self, key):
+        """
+        Gets the board configuration and turn encoded in a key made by get_position_key
+        in the form: [spots, player_turn]
+        """
+        return [[list(key[j:j + self.WIDTH]) for j in range(0, self.HEIGHT * self.WIDTH, self.WIDTH)],
+                key[self.HEIGHT * self.WIDTH] == 1]
+
+    def pack_move(self, move):
+        """
+        Gets a compact encoding (bytes) of a move, with one byte for each location in it.
+        """
+        return bytes([location[0] * self.WIDTH + location[1] for location in move])
+
+    def unpack_move(self, packed_move):
+        """
+        Gets the move encoded in a packed move made by pack_move.
+        """
+        return [[square // self.WIDTH, square % self.WIDTH] for square in packed_move]
+
+    def get_rotated_spots(self, spots=None):
+        """
+        Gets a board configuration (the board's own if not given) turned 180 degrees with the colours
+        of its pieces swapped, which is the same position seen from the other player's side.
+        Rotating twice gives back the original configuration.
+        """
+        if spots is None:
+            spots = self.spots
+        return [[self.SWAPPED_PIECES[spot] for spot in reversed(row)] for row in reversed(spots)]
+
+    def get_rotated_move(self, move):
+        """
+        Gets the move matching the given one on the rotated board configuration (see get_rotated_spots).
+        """
+        return [[self.HEIGHT - 1 - location[0], self.WIDTH - 1 - location[1]] for location in move]
+
+    def get_canonical_spots(self, spots=None, player_turn=None):
+        """
+        Gets a board configuration in its canonical form: from the side of the player to move, as
+        if it were player 1.  Configurations with player 1 to move are unchanged, and ones with
+        player 2 to move are rotated.  If not given, the board's own spots and turn are used.
+        """
+        if spots is None:
+            spots = self.spots
+        if player_turn is None:
+            player_turn = self.player_turn
+        if player_turn:
+            return spots
+        return self.get_rotated_spots(spots)
+
+    def get_canonical_key(self, spots=None, player_turn=None):
+        """
+        Gets the position key (see get_position_key) of a board configuration's canonical form, which
+        is equal for a position and its rotated twin with the other player to move.
+        """
+        return self.get_position_key(self.get_canonical_spots(spots, player_turn), True)
+
+    def get_canonical_move(self, move, player_turn=None):
+        """
+        Gets the move matching the given one on the canonical form of a configuration with the given
+        player to move (the board's own turn if not given).
+        """
+        if player_turn is None:
+            player_turn = self.player_turn
+        if player_turn:
+            return move
+        return self.get_rotated_move(move)
+
+    def get_move_from_canonical(self, canonical_move, player_turn=None):
+        """
+        Gets the move matching a move on the canonical form of a configuration, on the configuration
+        itself.  This is the inverse of get_canonical_move (and the same mapping, since rotating
+        twice changes nothing).
+        """
+        return self.get_canonical_move(canonical_move, player_turn)
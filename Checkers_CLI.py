@@ -0,0 +1,319 @@
+"""
+Command line entry point for training players, playing matches and tournaments, and
+benchmarking, e.g.:
+
+python Checkers_CLI.py match alphabeta:3 random --games 100 --workers 4
+python Checkers_CLI.py match alphabeta:3 qlearning --games 20 --profile sampling --profile-output match
+python Checkers_CLI.py match alphabeta:6 random --games 10 --move-time .05 --forfeit
+python Checkers_CLI.py match vi:rtdp:50 alphabeta:1 --games 2 --move-limit 100
+python Checkers_CLI.py train qlearning --opponent alphabeta:2 --games 1000 --save data.json
+python Checkers_CLI.py tournament alphabeta:1 alphabeta:2 random --max-games 50 --sprt 0 100 .05 .05
+python Checkers_CLI.py bench --compare baseline.json
+
+Players are given as specs:
+-alphabeta:DEPTH
+-random
+-qlearning[:FILE]   (a Q_Learning_AI, loading its transitions from FILE if given)
+-td[:FILE]          (a TD_Lambda_AI, loading its weights from FILE if given)
+-vi:rtdp[:TRIALS[:SECONDS]]
+                    (a Value_Iteration_AI against the other player of a match, only as player 1, which
+                    plans each move with RTDP within TRIALS trials (100 by default) and SECONDS seconds)
+
+NOTES:
+-Modules are only imported by the commands which use them, so starting up stays fast.
+-Outside of training, learning players don't learn during games.
+-Options shared by the commands (e.g. --workers, --seed, --move-limit) are given after the command.
+-A full value iteration from the starting configuration never finishes, so vi players need an RTDP budget.
+"""
+
+import sys
+import random
+import argparse
+
+
+def build_alpha_beta(player_id, depth):
+    from AI import Alpha_beta
+    return Alpha_beta(player_id, depth)
+
+
+def build_q_learning(player_id, learning_rate, discount_factor, info_location=None, random_move_probability=0,
+                     training=False, canonical_states=False):
+    from AI import Q_Learning_AI
+    player = Q_Learning_AI(player_id, learning_rate, discount_factor, info_location=info_location,
+                           the_random_move_probability=random_move_probability,
+                           the_canonical_states=canonical_states)
+    player.set_training(training)
+    return player
+
+
+def build_td_lambda(player_id, learning_rate, discount_factor, trace_decay, info_location=None,
+                    random_move_probability=0, training=False):
+    from TD_Lambda_AI import TD_Lambda_AI
+    player = TD_Lambda_AI(player_id, learning_rate, discount_factor, trace_decay, info_location=info_location,
+                          the_random_move_probability=random_move_probability)
+    player.set_training(training)
+    return player
+
+
+def build_value_iteration(opponent_config, rtdp=False, rtdp_trials=100, rtdp_time=None):
+    from Player import build_player
+    from Value_Iteration_AI import Value_Iteration_AI
+    return Value_Iteration_AI(opponent=build_player(opponent_config), rtdp=rtdp, rtdp_trials=rtdp_trials,
+                              rtdp_time=rtdp_time)
+
+
+def get_player_config(spec, player_id, args, opponent_spec=None, training=False):
+    """
+    Gets the picklable configuration (see Player.build_player) of the player described by a spec,
+    playing as player 1 if player_id is True and player 2 otherwise.
+    """
+    name, _, value = spec.partition(":")
+    if value == "":
+        value = None
+
+    if name == "alphabeta":
+        return (build_alpha_beta, (player_id, int(value or 2)))
+    if name == "random":
+        return (build_q_learning, (player_id, 0, 0), {"random_move_probability": 1})
+    if name == "qlearning":
+        return (build_q_learning, (player_id, args.learning_rate, args.discount_factor),
+                {"info_location": value, "random_move_probability": args.random_move_probability * training,
+                 "training": training, "canonical_states": args.canonical_states})
+    if name == "td":
+        return (build_td_lambda, (player_id, args.learning_rate, args.discount_factor, args.trace_decay),
+                {"info_location": value, "random_move_probability": args.random_move_probability * training,
+                 "training": training})
+    if name == "vi":
+        if not player_id or opponent_spec is None:
+            raise ValueError("vi can only play as player 1 of a match")
+        budget = (value or "").split(":")
+        if budget[0] != "rtdp":
+            raise ValueError("vi needs an RTDP budget, e.g. vi:rtdp or vi:rtdp:TRIALS:SECONDS")
+        rtdp_trials = 100
+        rtdp_time = None
+        if len(budget) > 1:
+            rtdp_trials = int(budget[1])
+        if len(budget) > 2:
+            rtdp_time = float(budget[2])
+        return (build_value_iteration, (get_player_config(opponent_spec, not player_id, args),),
+                {"rtdp": True, "rtdp_trials": rtdp_trials, "rtdp_time": rtdp_time})
+    raise ValueError("Unknown player spec: " + spec)
+
+
+def get_draw_rules(args):
+    """
+    Gets the Draw_Rules asked for by the arguments, or None if none were.
+    """
+    if args.repetitions is None and args.quiet_plies is None:
+        return None
+    from Draw_Rules import Draw_Rules
+    return Draw_Rules(args.repetitions, args.quiet_plies)
+
+
+def get_time_control(args):
+    """
+    Gets the Time_Control asked for by the arguments, or None if none was.
+    """
+    if args.move_time is None and args.base_time is None:
+        return None
+    from Time_Control import Time_Control
+    return Time_Control(args.move_time, args.base_time, args.increment, args.forfeit)
+
+
+def run_match(args):
+    from Player import build_player
+    from AI import iterate_n_games, pretty_outcome_display
+    from Match_Log import Match_Log, Outcome_Statistics, record_games
+
+    player1_config = get_player_config(args.player1, True, args, opponent_spec=args.player2)
+    player2_config = get_player_config(args.player2, False, args, opponent_spec=args.player1)
+    draw_rules = get_draw_rules(args)
+    time_control = get_time_control(args)
+
+    hooks = []
+    if args.archive is not None:
+        from Game_Archive import Game_Archive, Game_Recording_Hook
+        hooks.append(Game_Recording_Hook(Game_Archive(args.archive)))
+    if args.timing:
+        from Game_Hooks import Timing_Hook
+        hooks.append(Timing_Hook())
+
+    profiler = None
+    profile_results = None
+    if args.workers > 1:
+        if len(hooks) != 0 or time_control is not None:
+            raise ValueError("--archive, --timing and time controls can only be used with one worker")
+        if args.profile is not None:
+            from Match_Runner import profile_n_games_in_parallel
+            outcomes, profile_results = profile_n_games_in_parallel(player1_config, player2_config, args.games,
+                                                                    args.move_limit, args.workers, args.seed,
+                                                                    draw_rules=draw_rules, mode=args.profile)
+        else:
+            from Match_Runner import iterate_n_games_in_parallel
+            outcomes = iterate_n_games_in_parallel(player1_config, player2_config, args.games, args.move_limit,
+                                                   args.workers, args.seed, draw_rules=draw_rules)
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+        player1 = build_player(player1_config)
+        player2 = build_player(player2_config)
+        if args.profile is not None:
+            from Profiling import Profiler
+            profiler = Profiler(args.profile)
+            player1.enable_profiling(profiler, "player1")
+            player2.enable_profiling(profiler, "player2")
+            profiler.start()
+        outcomes = iterate_n_games(player1, player2, args.games, args.move_limit, hooks, draw_rules, time_control)
+
+    statistics = Outcome_Statistics()
+    log = None
+    if args.log is not None:
+        log = Match_Log(args.log)
+    for _ in record_games(outcomes, log, statistics):
+        pass
+    if log is not None:
+        log.close()
+    if profiler is not None:
+        profile_results = profiler.stop()
+
+    pretty_outcome_display(statistics)
+    for hook in hooks:
+        if hasattr(hook, "print_summary"):
+            print("")
+            hook.print_summary()
+    if time_control is not None:
+        print("")
+        time_control.print_summary()
+    if profile_results is not None:
+        print("")
+        profile_results.print_summary()
+        for file_name in profile_results.save(args.profile_output):
+            print("Wrote", file_name)
+
+
+def run_training(args):
+    from Player import build_player
+    from AI import Q_Learning_AI, iterate_n_games, pretty_outcome_display
+    from Match_Log import Match_Log, Outcome_Statistics, record_games
+
+    learner = build_player(get_player_config(args.player, True, args, training=True))
+    opponent_config = get_player_config(args.opponent, False, args)
+
+    if args.workers > 1:
+        if not isinstance(learner, Q_Learning_AI):
+            raise ValueError("Only qlearning players can be trained with more than one worker")
+        from Parallel_Training import train_in_parallel
+        outcomes = train_in_parallel(learner, opponent_config, args.games, args.move_limit, args.workers,
+                                     seed=args.seed)
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+        outcomes = iterate_n_games(learner, build_player(opponent_config), args.games, args.move_limit,
+                                   draw_rules=get_draw_rules(args))
+
+    statistics = Outcome_Statistics()
+    log = None
+    if args.log is not None:
+        log = Match_Log(args.log)
+    for _ in record_games(outcomes, log, statistics):
+        pass
+    if log is not None:
+        log.close()
+    pretty_outcome_display(statistics)
+
+    if args.save is not None:
+        if isinstance(learner, Q_Learning_AI):
+            learner.save_transition_information(args.save)
+        else:
+            learner.save_weights(args.save)
+
+
+def run_tournament(args):
+    from Tournament import Tournament
+
+    entries = [[spec, get_player_config(spec, True, args), get_player_config(spec, False, args)]
+               for spec in args.players]
+    tournament = Tournament(entries, args.move_limit, args.games_per_round, args.max_games, args.workers,
+                            args.seed, args.sprt, get_draw_rules(args))
+    tournament.play()
+    tournament.print_standings()
+
+
+def run_benchmark(args):
+    from Benchmarks import main as benchmark_main
+
+    status = benchmark_main(args.bench_args)
+    if status != 0:
+        sys.exit(status)
+
+
+def get_parser():
+    # Options shared by every command but bench, given after the command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--learning-rate", type=float, default=.005)
+    common.add_argument("--discount-factor", type=float, default=.3)
+    common.add_argument("--trace-decay", type=float, default=.7)
+    common.add_argument("--random-move-probability", type=float, default=.25,
+                        help="exploration of learning players while training")
+    common.add_argument("--canonical-states", action="store_true",
+                        help="qlearning players see every position as player 1, so one table serves either side")
+    common.add_argument("--move-limit", type=int, default=500)
+    common.add_argument("--workers", type=int, default=1)
+    common.add_argument("--seed", default=None)
+    common.add_argument("--repetitions", type=int, default=None, help="draw on this many repetitions")
+    common.add_argument("--quiet-plies", type=int, default=None,
+                        help="draw after this many plies without a capture or man move")
+
+    parser = argparse.ArgumentParser(description="Train and play checkers AI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    match = commands.add_parser("match", parents=[common], help="play games between two players")
+    match.add_argument("player1")
+    match.add_argument("player2")
+    match.add_argument("--games", type=int, default=100)
+    match.add_argument("--log", default=None, help="file to append each game's outcome to")
+    match.add_argument("--archive", default=None, help="Game_Archive to record the games in")
+    match.add_argument("--timing", action="store_true", help="print each player's move times")
+    match.add_argument("--move-time", type=float, default=None, help="seconds each player has per move")
+    match.add_argument("--base-time", type=float, default=None, help="seconds each player has per game")
+    match.add_argument("--increment", type=float, default=0, help="seconds added to a player's clock per move")
+    match.add_argument("--forfeit", action="store_true", help="a player who runs out of time loses the game")
+    match.add_argument("--profile", choices=["cprofile", "sampling"], default=None,
+                       help="profile the players and game loop (see Profiling)")
+    match.add_argument("--profile-output", default="profile", help="prefix of the profile files written")
+    match.set_defaults(function=run_match)
+
+    train = commands.add_parser("train", parents=[common], help="train a learning player against an opponent")
+    train.add_argument("player", help="qlearning[:FILE] or td[:FILE]")
+    train.add_argument("--opponent", default="alphabeta:2")
+    train.add_argument("--games", type=int, default=100)
+    train.add_argument("--save", default=None, help="file to save what was learned to")
+    train.add_argument("--log", default=None, help="file to append each game's outcome to")
+    train.set_defaults(function=run_training)
+
+    tournament = commands.add_parser("tournament", parents=[common], help="play a round-robin tournament")
+    tournament.add_argument("players", nargs="+")
+    tournament.add_argument("--games-per-round", type=int, default=2)
+    tournament.add_argument("--max-games", type=int, default=100)
+    tournament.add_argument("--sprt", type=float, nargs=4, default=None, metavar=("ELO0", "ELO1", "ALPHA", "BETA"))
+    tournament.set_defaults(function=run_tournament)
+
+    # Everything after "bench" is handed to Benchmarks.main (see main)
+    bench = commands.add_parser("bench", help="run the benchmark suite (see Benchmarks)", add_help=False)
+    bench.set_defaults(function=run_benchmark)
+
+    return parser
+
+
+def main(argv=None):
+    parser = get_parser()
+    args, extra_args = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.bench_args = extra_args
+    elif len(extra_args) != 0:
+        parser.error("unrecognized arguments: " + " ".join(extra_args))
+    args.function(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
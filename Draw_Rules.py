@@ -0,0 +1,88 @@
+"""
+Rules for ending games early which are (or are as good as) decided, instead of playing
+them out to the move limit.
+
+NOTES:
+-Games drawn by a rule are given the outcome code DRAWN_BY_RULE.  Games adjudicated on
+material are given the normal outcome code for a win by the player ahead.
+-The position history is only kept since the last capture or man move, since no position
+before one can appear again after it.
+"""
+
+DRAWN_BY_RULE = 4
+
+
+class Draw_Rules:
+    """
+    A class to track the positions of one game at a time (see reset and update) and decide when
+    it should end early.  Any rule given as None isn't used.
+
+    -repetitions: the game is drawn the repetitions-th time the same position (with the same
+    player to move) appears
+    -quiet_ply_limit: the game is drawn after this many plies in a row without a capture or a
+    man (not king) moving
+    -material_margin: after material_min_ply plies, the game is won by a player whose material
+    (men count 1, kings count king_value) is ahead by at least this much
+    """
+
+    def __init__(self, repetitions=3, quiet_ply_limit=None, material_margin=None, material_min_ply=0,
+                 king_value=2):
+        self.repetitions = repetitions
+        self.quiet_ply_limit = quiet_ply_limit
+        self.material_margin = material_margin
+        self.material_min_ply = material_min_ply
+        self.king_value = king_value
+
+        self.position_counts = {}
+        self.last_key = None
+        self.quiet_plies = 0
+        self.ply = 0
+
+    def reset(self, board):
+        """
+        Starts tracking a new game from the board's current configuration.
+        """
+        self.last_key = board.get_position_key()
+        self.position_counts = {self.last_key: 1}
+        self.quiet_plies = 0
+        self.ply = 0
+
+    def update(self, board, move):
+        """
+        Records a move which has just been made on the board, and returns the outcome code the
+        game should end with, or None if it should go on.
+        """
+        key = board.get_position_key()
+        start = move[0][0] * board.WIDTH + move[0][1]
+        self.ply = self.ply + 1
+
+        if abs(move[0][0] - move[1][0]) == 2 or self.last_key[start] in (board.P1, board.P2):
+            self.quiet_plies = 0
+            self.position_counts = {}
+        else:
+            self.quiet_plies = self.quiet_plies + 1
+        self.last_key = key
+
+        count = self.position_counts.get(key, 0) + 1
+        self.position_counts[key] = count
+
+        if self.repetitions is not None and count >= self.repetitions:
+            return DRAWN_BY_RULE
+        if self.quiet_ply_limit is not None and self.quiet_plies >= self.quiet_ply_limit:
+            return DRAWN_BY_RULE
+        if self.material_margin is not None and self.ply >= self.material_min_ply:
+            return self.adjudicate_material(board)
+        return None
+
+    def adjudicate_material(self, board):
+        """
+        Gets the outcome code of a win for a player ahead on material by at least material_margin,
+        or None if neither is.
+        """
+        pieces = board.get_number_of_pieces_and_kings(board.spots)
+        difference = pieces[0] - pieces[1] + self.king_value * (pieces[2] - pieces[3])
+        if difference >= self.material_margin:
+            return 0
+        if -difference >= self.material_margin:
+            return 1
+        return None
@@ -0,0 +1,255 @@
+"""
+A compact binary archive of played games, with an index for reading any game directly,
+PDN import/export, and replaying of recorded games through Board.make_move .
+
+The archive is two files:
+-the data file: ARCHIVE_HEADER then one record per game, in the form:
+[outcome (6 int16s, as returned by play_n_games), num_moves (uint16), then for each move:
+its length (1 byte) followed by its squares packed with Board.pack_move]
+-the index file (data file name + ".index"): the offset of every game's record, as int64s
+
+NOTES:
+-Squares are written in PDN as row * 4 + (3 - column) + 1, which is the standard numbering
+(player 1 starts on squares 1 to 12 and moves first, e.g. "11-15" is a standard opening move).
+-A game from a PDN file which doesn't end in a finished position is given the outcome for
+hitting the move limit.
+"""
+
+import os
+import re
+import struct
+
+import numpy as np
+
+from Board import Board
+from Game_Hooks import Game_Hook
+from AI import get_game_outcome
+
+ARCHIVE_HEADER = b"CKGA"
+OUTCOME_FORMAT = "<6hH"
+PDN_RESULTS = {0: "1-0", 1: "0-1", 2: "1/2-1/2", 3: "*", 4: "1/2-1/2"}
+
+
+class Game_Archive:
+    """
+    A class to append games to, and read games from, an archive.
+    """
+
+    def __init__(self, file_name):
+        """
+        Opens the archive with the given data file name, creating it if it doesn't exist.
+        """
+        self.file_name = file_name
+        self.index_file_name = file_name + ".index"
+        if not os.path.exists(file_name):
+            with open(file_name, 'wb') as fp:
+                fp.write(ARCHIVE_HEADER)
+            open(self.index_file_name, 'wb').close()
+
+        with open(file_name, 'rb') as fp:
+            if fp.read(len(ARCHIVE_HEADER)) != ARCHIVE_HEADER:
+                raise ValueError(file_name + " is not a game archive")
+        self.offsets = np.fromfile(self.index_file_name, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def add_game(self, packed_moves, outcome):
+        """
+        Appends a game, given as its moves packed with Board.pack_move and its outcome.
+        """
+        record = [struct.pack(OUTCOME_FORMAT, *[int(value) for value in outcome], len(packed_moves))]
+        for packed_move in packed_moves:
+            record.append(bytes([len(packed_move)]))
+            record.append(packed_move)
+
+        with open(self.file_name, 'ab') as fp:
+            offset = fp.tell()
+            fp.write(b"".join(record))
+        with open(self.index_file_name, 'ab') as fp:
+            fp.write(struct.pack("<q", offset))
+        self.offsets = np.append(self.offsets, offset)
+
+    def get_game(self, game_number):
+        """
+        Gets a game from the archive in the form: [packed_moves, outcome]
+        """
+        with open(self.file_name, 'rb') as fp:
+            fp.seek(self.offsets[game_number])
+            info = struct.unpack(OUTCOME_FORMAT, fp.read(struct.calcsize(OUTCOME_FORMAT)))
+            packed_moves = []
+            for _ in range(info[6]):
+                packed_moves.append(fp.read(fp.read(1)[0]))
+
+        return [packed_moves, list(info[:6])]
+
+    def get_outcomes(self):
+        """
+        Gets the outcome of every game in the archive, as an array with one row per game.
+        """
+        answer = np.zeros((len(self), 6), dtype=np.int64)
+        with open(self.file_name, 'rb') as fp:
+            for j, offset in enumerate(self.offsets):
+                fp.seek(offset)
+                answer[j] = struct.unpack(OUTCOME_FORMAT, fp.read(struct.calcsize(OUTCOME_FORMAT)))[:6]
+        return answer
+
+    def replay(self, game_number, num_moves=None):
+        """
+        Gets a Board showing a game from the archive after num_moves of its moves (all of them by default).
+        """
+        return replay_moves(self.get_game(game_number)[0], num_moves)
+
+    def export_pdn(self, file_name, game_numbers=None, event="Checkers"):
+        """
+        Writes games from the archive (all of them by default) to a PDN file.
+        """
+        if game_numbers is None:
+            game_numbers = range(len(self))
+        with open(file_name, 'w') as fp:
+            for game_number in game_numbers:
+                packed_moves, outcome = self.get_game(game_number)
+                fp.write(get_pdn_game(packed_moves, outcome, event + " " + str(game_number + 1)))
+
+    def import_pdn(self, file_name):
+        """
+        Appends every game in a PDN file to the archive.  Returns how many games were added.
+        """
+        with open(file_name, 'r') as fp:
+            games = read_pdn_games(fp.read())
+
+        for packed_moves in games:
+            board = replay_moves(packed_moves)
+            if board.is_game_over():
+                outcome = get_game_outcome(board, len(packed_moves), len(packed_moves) + 1)
+            else:
+                outcome = get_game_outcome(board, len(packed_moves), len(packed_moves))
+            self.add_game(packed_moves, outcome)
+
+        return len(games)
+
+
+class Game_Recording_Hook(Game_Hook):
+    """
+    A hook (see Game_Hooks) which adds every game played to a Game_Archive.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.packed_moves = []
+
+    def game_started(self, game_board):
+        self.packed_moves = []
+
+    def after_move(self, game_board, player, move):
+        self.packed_moves.append(game_board.pack_move(move))
+
+    def game_ended(self, game_board, outcome):
+        self.archive.add_game(self.packed_moves, outcome)
+
+
+def replay_moves(packed_moves, num_moves=None, board=None):
+    """
+    Makes the first num_moves (all of them by default) of the given packed moves, starting from
+    the starting board configuration with player 1 to move, and returns the Board.
+    """
+    if board is None:
+        board = Board()
+    if num_moves is None:
+        num_moves = len(packed_moves)
+    for packed_move in packed_moves[:num_moves]:
+        board.make_move(board.unpack_move(packed_move))
+    return board
+
+
+def iterate_positions(packed_moves):
+    """
+    Yields the board configuration (spots) and turn after each move of a game, in the form: [spots, player_turn]
+    """
+    board = Board()
+    for packed_move in packed_moves:
+        board.make_move(board.unpack_move(packed_move))
+        yield [[row[:] for row in board.spots], board.player_turn]
+
+
+def get_pdn_square(square):
+    """
+    Gets the PDN number (1 to 32) of a square (row * 4 + column).
+    """
+    return square // 4 * 4 + (3 - square % 4) + 1
+
+
+def get_square_from_pdn(number):
+    """
+    Gets the square (row * 4 + column) with the given PDN number.
+    """
+    return (number - 1) // 4 * 4 + (3 - (number - 1) % 4)
+
+
+def get_pdn_move(packed_move):
+    """
+    Gets the PDN text of a packed move, e.g. "9-13" or "9x18x27".
+    """
+    squares = [str(get_pdn_square(square)) for square in packed_move]
+    if len(packed_move) == 2 and abs(packed_move[0] // 4 - packed_move[1] // 4) == 1:
+        return "-".join(squares)
+    return "x".join(squares)
+
+
+def get_pdn_game(packed_moves, outcome, event="Checkers"):
+    """
+    Gets the PDN text of one game.
+    """
+    result = PDN_RESULTS.get(outcome[0], "*")
+    lines = ['[Event "' + event + '"]', '[Result "' + result + '"]', ""]
+    move_text = []
+    for j, packed_move in enumerate(packed_moves):
+        if j % 2 == 0:
+            move_text.append(str(j // 2 + 1) + ".")
+        move_text.append(get_pdn_move(packed_move))
+    move_text.append(result)
+
+    for j in range(0, len(move_text), 12):
+        lines.append(" ".join(move_text[j:j + 12]))
+    return "\n".join(lines) + "\n\n"
+
+
+def read_pdn_games(text):
+    """
+    Gets the moves of every game in the given PDN text, each as a list of packed moves.  Moves which
+    only give some of the squares a capture goes through are matched to the legal move they describe.
+    """
+    games = []
+    text = re.sub(r"\{[^}]*\}", " ", text)
+    for game_text in re.split(r"\n\s*\n(?=\s*\[)", text):
+        move_text = re.sub(r"\[[^\]]*\]", " ", game_text)
+        move_tokens = [token for token in move_text.split()
+                       if not re.fullmatch(r"\d+\.+|1-0|0-1|1/2-1/2|\*", token)]
+        if len(move_tokens) == 0:
+            continue
+
+        board = Board()
+        packed_moves = []
+        for token in move_tokens:
+            squares = [get_square_from_pdn(int(square)) for square in re.split(r"[-x]", token)]
+            packed_move = find_legal_move(board, squares)
+            if packed_move is None:
+                raise ValueError("Illegal move in PDN: " + token)
+            board.make_move(board.unpack_move(packed_move))
+            packed_moves.append(packed_move)
+        games.append(packed_moves)
+
+    return games
+
+
+def find_legal_move(board, squares):
+    """
+    Gets the legal move (packed) on the board which starts and ends on the given squares and
+    goes through any others given in between, or None if there isn't one.
+    """
+    for move in board.get_possible_next_moves():
+        packed_move = board.pack_move(move)
+        if packed_move[0] == squares[0] and packed_move[-1] == squares[-1] and \
+                all(square in packed_move for square in squares[1:-1]):
+            return packed_move
+    return None
@@ -0,0 +1,131 @@
+"""
+Hooks which can be given to play_game/play_n_games to be told about the events of each
+game: the start of a game, before and after every move, and the end of a game.
+
+NOTES:
+-When a hook is told about a move, game_board.player_turn is still the turn of the player
+making it in before_move, and has been switched in after_move.
+-No hook methods are called (and nothing is timed) when no hooks are given.
+"""
+
+import time
+
+
+class Game_Hook:
+    """
+    A class to be inherited by any hook.  Each method is called at the matching event, and
+    does nothing unless overridden.
+    """
+
+    def game_started(self, game_board):
+        pass
+
+    def before_move(self, game_board, player):
+        pass
+
+    def after_move(self, game_board, player, move):
+        pass
+
+    def game_ended(self, game_board, outcome):
+        """
+        outcome is the game's information in the format returned by play_n_games.
+        """
+        pass
+
+
+class Board_Printing_Hook(Game_Hook):
+    """
+    A hook which prints the board after every move.
+    """
+
+    def after_move(self, game_board, player, move):
+        game_board.print_board()
+
+
+class Replanning_Hook(Game_Hook):
+    """
+    A hook which has a Value_Iteration_AI redo its value iteration after each of its moves.
+    """
+
+    def __init__(self, player):
+        self.player = player
+
+    def after_move(self, game_board, player, move):
+        if player is self.player:
+            self.player.value_iteration()
+
+
+class Timing_Hook(Game_Hook):
+    """
+    A hook which records, for every move, how long each player (1 or 2) took to make it, and
+    how much of that time was spent generating moves on the game board.  The rest of the time
+    is counted as search time.
+
+    NOTES:
+    -Move generation is timed by wrapping the game board's get_possible_next_moves during a
+    game, so moves generated on other boards (e.g. copies made during a search) count as search.
+    """
+
+    def __init__(self):
+        self.move_times = {1: [], 2: []}
+        self.move_generation_times = {1: [], 2: []}
+        self.search_times = {1: [], 2: []}
+        self.current_player = None
+        self.move_start_time = 0
+        self.current_move_generation_time = 0
+
+    def game_started(self, game_board):
+        get_possible_next_moves = game_board.get_possible_next_moves
+
+        def timed_get_possible_next_moves(*args, **kwargs):
+            if self.current_player is None:
+                return get_possible_next_moves(*args, **kwargs)
+            start_time = time.perf_counter()
+            answer = get_possible_next_moves(*args, **kwargs)
+            self.current_move_generation_time = self.current_move_generation_time + time.perf_counter() - start_time
+            return answer
+
+        game_board.get_possible_next_moves = timed_get_possible_next_moves
+
+    def before_move(self, game_board, player):
+        if game_board.player_turn:
+            self.current_player = 1
+        else:
+            self.current_player = 2
+        self.current_move_generation_time = 0
+        self.move_start_time = time.perf_counter()
+
+    def after_move(self, game_board, player, move):
+        move_time = time.perf_counter() - self.move_start_time
+        self.move_times[self.current_player].append(move_time)
+        self.move_generation_times[self.current_player].append(self.current_move_generation_time)
+        self.search_times[self.current_player].append(move_time - self.current_move_generation_time)
+        self.current_player = None
+
+    def game_ended(self, game_board, outcome):
+        del game_board.get_possible_next_moves
+
+    def get_summary(self):
+        """
+        Gets the timing information of each player in the form:
+        {player: [num_moves, total_move_time, total_move_generation_time, total_search_time, max_move_time]}
+        """
+        answer = {}
+        for player in self.move_times:
+            times = self.move_times[player]
+            answer[player] = [len(times), sum(times), sum(self.move_generation_times[player]),
+                              sum(self.search_times[player]), max(times, default=0)]
+        return answer
+
+    def print_summary(self):
+        """
+        Prints the timing information of each player.
+        """
+        for player, info in self.get_summary().items():
+            print("Player " + str(player) + ":")
+            print("Moves made: ".ljust(35), info[0])
+            print("Total move time: ".ljust(35), info[1])
+            print("Average move time: ".ljust(35), info[1] / max(info[0], 1))
+            print("Max move time: ".ljust(35), info[4])
+            print("Move generation time: ".ljust(35), info[2])
+            print("Search time: ".ljust(35), info[3])
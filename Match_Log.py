@@ -0,0 +1,158 @@
+"""
+Streaming storage and statistics for game outcomes (in the format returned by play_n_games).
+
+Outcomes are appended to a log file as they come in, one line of space separated numbers
+per game, and flushed straight away, so every game finished before a run is interrupted
+can be read back with read_match_log.  Statistics are kept with a fixed amount of memory
+(apart from one row of counts per interval when an interval is given).
+"""
+
+import numpy as np
+
+# Outcome codes are 0 (player 1 won), 1 (player 2 won), 2 (tied), 3 (hit the move limit)
+# and 4 (drawn by a rule, see Draw_Rules)
+NUM_OUTCOMES = 5
+OUTCOME_LENGTH = 6
+
+
+class Match_Log:
+    """
+    A class to append game outcomes to a log file.
+    """
+
+    def __init__(self, file_name):
+        """
+        Opens the log file, keeping any outcomes already in it.
+        """
+        self.file_name = file_name
+        self.file = open(file_name, 'a')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, outcome):
+        """
+        Writes one game's outcome to the end of the log.
+        """
+        self.file.write(" ".join(str(int(value)) for value in outcome) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_match_log(file_name):
+    """
+    Reads the outcomes in a log file written by Match_Log into an array with one row per game.
+    A last line which was only partly written (e.g. if the run was killed) is left out.
+    """
+    with open(file_name, 'r') as fp:
+        text = fp.read()
+    if not text.endswith("\n"):
+        text = text[:text.rfind("\n") + 1]
+
+    values = np.array(text.split(), dtype=np.int64)
+    return values.reshape(-1, OUTCOME_LENGTH)
+
+
+def get_interval_counts(outcomes, interval):
+    """
+    Gets how many times each outcome happened in each complete group of interval games, as an
+    array with one row per interval and one column per outcome code.
+    """
+    outcomes = np.asarray(outcomes, dtype=np.int64).reshape(-1, OUTCOME_LENGTH)
+    num_intervals = len(outcomes) // interval
+    codes = outcomes[:num_intervals * interval, 0]
+    bins = np.arange(num_intervals * interval) // interval * NUM_OUTCOMES + codes
+    return np.bincount(bins, minlength=num_intervals * NUM_OUTCOMES).reshape(num_intervals, NUM_OUTCOMES)
+
+
+class Outcome_Statistics:
+    """
+    A class to keep running totals of game outcomes: how many of each outcome there were, and the
+    total, min and max number of moves made.  If given an interval, the counts of each outcome in
+    every complete group of interval games are kept too.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval
+        self.num_games = 0
+        self.outcome_counts = np.zeros(NUM_OUTCOMES, dtype=np.int64)
+        self.total_moves = 0
+        self.max_moves_made = float("-inf")
+        self.min_moves_made = float("inf")
+        self.interval_counts = []
+        self.current_interval_counts = np.zeros(NUM_OUTCOMES, dtype=np.int64)
+
+    def add(self, outcome):
+        """
+        Adds one game's outcome to the statistics.
+        """
+        self.num_games = self.num_games + 1
+        self.outcome_counts[outcome[0]] = self.outcome_counts[outcome[0]] + 1
+        self.total_moves = self.total_moves + int(outcome[1])
+        self.max_moves_made = max(self.max_moves_made, int(outcome[1]))
+        self.min_moves_made = min(self.min_moves_made, int(outcome[1]))
+
+        if self.interval is not None:
+            self.current_interval_counts[outcome[0]] = self.current_interval_counts[outcome[0]] + 1
+            if np.sum(self.current_interval_counts) == self.interval:
+                self.interval_counts.append(self.current_interval_counts)
+                self.current_interval_counts = np.zeros(NUM_OUTCOMES, dtype=np.int64)
+
+    def add_all(self, outcomes):
+        """
+        Adds a batch of outcomes (e.g. a chunk read from a log) to the statistics at once.
+        """
+        outcomes = np.asarray(outcomes, dtype=np.int64).reshape(-1, OUTCOME_LENGTH)
+        if len(outcomes) == 0:
+            return
+
+        if self.interval is not None:
+            # Finish the partly filled interval one game at a time, then bin the rest at once
+            num_to_fill = min(len(outcomes), (self.interval - int(np.sum(self.current_interval_counts))) % self.interval)
+            for outcome in outcomes[:num_to_fill]:
+                self.add(outcome)
+            outcomes = outcomes[num_to_fill:]
+
+            complete_counts = get_interval_counts(outcomes, self.interval)
+            self.interval_counts.extend(complete_counts)
+            self.current_interval_counts = self.current_interval_counts + \
+                np.bincount(outcomes[len(complete_counts) * self.interval:, 0], minlength=NUM_OUTCOMES)
+            if len(outcomes) == 0:
+                return
+
+        self.num_games = self.num_games + len(outcomes)
+        self.outcome_counts = self.outcome_counts + np.bincount(outcomes[:, 0], minlength=NUM_OUTCOMES)
+        self.total_moves = self.total_moves + int(np.sum(outcomes[:, 1]))
+        self.max_moves_made = max(self.max_moves_made, int(np.max(outcomes[:, 1])))
+        self.min_moves_made = min(self.min_moves_made, int(np.min(outcomes[:, 1])))
+
+    def get_average_moves(self):
+        if self.num_games == 0:
+            return 0
+        return self.total_moves / self.num_games
+
+    def get_interval_counts(self):
+        """
+        Gets the counts of each outcome in every complete interval, as an array with one row per interval.
+        """
+        if len(self.interval_counts) == 0:
+            return np.zeros((0, NUM_OUTCOMES), dtype=np.int64)
+        return np.array(self.interval_counts)
+
+
+def record_games(outcomes, log=None, statistics=None):
+    """
+    Passes through a stream of game outcomes (e.g. from iterate_n_games), appending each one to
+    the given Match_Log and adding it to the given Outcome_Statistics as it goes by.
+    """
+    for outcome in outcomes:
+        if log is not None:
+            log.append(outcome)
+        if statistics is not None:
+            statistics.add(outcome)
+        yield outcome
@@ -0,0 +1,134 @@
+"""
+Plays matches between two players spread across a pool of worker processes.
+
+The games are split into fixed size tasks, and every task builds its own players
+and Board from picklable player configurations (see Player.build_player), so no
+player instance is shared between processes.
+
+NOTES:
+-Before every game the random module is seeded from the match seed and the game's
+number, so given the same seed and games_per_task, a match is reproducible no matter
+how many workers play it.
+-Players which learn only carry what they learn between the games of one task.
+-Matches can be profiled (see Profiling) with profile_n_games_in_parallel, which profiles
+every task in its worker and merges the results.
+"""
+
+import random
+from multiprocessing import Pool
+
+from Board import Board
+from Player import build_player
+from AI import play_game
+from Profiling import Profiler, Profile_Results
+
+
+def get_game_seed(seed, game_number):
+    """
+    Gets the seed used for the random module before the given game of a match.
+    """
+    return str(seed) + ":" + str(game_number)
+
+
+def play_match_games(task, profiler=None):
+    """
+    Plays a number of games in a worker process and returns their outcomes in the format
+    returned by play_n_games.  The players are profiled as "player1" and "player2" by
+    profiler (a Profiling.Profiler) if given.
+
+    task is in the form: [player1_config, player2_config, first_game, num_games, move_limit, seed, draw_rules]
+    with draw_rules being a Draw_Rules or None.
+    """
+    player1_config, player2_config, first_game, num_games, move_limit, seed, draw_rules = task
+
+    player1 = build_player(player1_config)
+    player2 = build_player(player2_config)
+    if profiler is not None:
+        player1.enable_profiling(profiler, "player1")
+        player2.enable_profiling(profiler, "player2")
+    game_board = Board()
+    player1.set_board(game_board)
+    player2.set_board(game_board)
+
+    outcomes = []
+    for game_number in range(first_game, first_game + num_games):
+        if seed is not None:
+            random.seed(get_game_seed(seed, game_number))
+        outcomes.append(play_game(player1, player2, game_board, move_limit, draw_rules=draw_rules))
+
+    return outcomes
+
+
+def profile_match_games(profile_task):
+    """
+    Plays and profiles the games of a task, and returns them in the form: [outcomes, profile_results]
+
+    profile_task is in the form: [task, mode, interval]
+    with task as given to play_match_games, and mode and interval as given to Profiling.Profiler .
+    """
+    task, mode, interval = profile_task
+    profiler = Profiler(mode, interval)
+    profiler.start()
+    try:
+        outcomes = play_match_games(task, profiler)
+    finally:
+        results = profiler.stop()
+    return [outcomes, results]
+
+
+def get_match_tasks(player1_config, player2_config, num_games, move_limit, seed=None, games_per_task=10,
+                    draw_rules=None):
+    """
+    Splits a match into the tasks given to play_match_games.
+    """
+    tasks = []
+    for first_game in range(0, num_games, games_per_task):
+        tasks.append([player1_config, player2_config, first_game, min(games_per_task, num_games - first_game),
+                      move_limit, seed, draw_rules])
+    return tasks
+
+
+def play_n_games_in_parallel(player1_config, player2_config, num_games, move_limit, num_workers=4, seed=None,
+                             games_per_task=10, draw_rules=None):
+    """
+    Plays num_games games between the players built from player1_config, who goes first, and
+    player2_config, across num_workers processes, ending games early with draw_rules if given.
+
+    Returns the outcomes of the games, in the order they were numbered, in the format
+    returned by play_n_games.
+    """
+    return list(iterate_n_games_in_parallel(player1_config, player2_config, num_games, move_limit, num_workers,
+                                            seed, games_per_task, draw_rules))
+
+
+def iterate_n_games_in_parallel(player1_config, player2_config, num_games, move_limit, num_workers=4, seed=None,
+                                games_per_task=10, draw_rules=None):
+    """
+    Plays the same games as play_n_games_in_parallel, but yields each game's outcome (in order)
+    as soon as the task it was played in is done, so they can be logged (see Match_Log) while
+    the match is still going.
+    """
+    tasks = get_match_tasks(player1_config, player2_config, num_games, move_limit, seed, games_per_task, draw_rules)
+
+    with Pool(num_workers) as pool:
+        for task_outcomes in pool.imap(play_match_games, tasks):
+            for outcome in task_outcomes:
+                yield outcome
+
+
+def profile_n_games_in_parallel(player1_config, player2_config, num_games, move_limit, num_workers=4, seed=None,
+                                games_per_task=10, draw_rules=None, mode="cprofile", interval=.005):
+    """
+    Plays the same games as play_n_games_in_parallel while profiling them (see Profiling) in
+    the given mode, and returns them in the form: [outcomes, profile_results]
+    where profile_results is a Profile_Results merged from every task.
+    """
+    tasks = get_match_tasks(player1_config, player2_config, num_games, move_limit, seed, games_per_task, draw_rules)
+
+    outcomes = []
+    results = Profile_Results(mode, interval=interval)
+    with Pool(num_workers) as pool:
+        for task_outcomes, task_results in pool.imap(profile_match_games, [[task, mode, interval] for task in tasks]):
+            outcomes.extend(task_outcomes)
+            results.merge(task_results)
+    return [outcomes, results]
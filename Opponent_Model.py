@@ -0,0 +1,103 @@
+"""
+A cache of an opponent's replies, keyed by position, which can be saved to and
+loaded from disk between runs.
+
+NOTES:
+-A saved cache records the description of the opponent it was made with (see
+Player.get_description) and whether its keys are canonical, and is ignored when loaded
+for any other opponent or kind of key.
+"""
+
+import os
+import json
+
+
+class Opponent_Model:
+    """
+    A class which remembers the distribution over replies an opponent (any class implementing
+    Player) gives in each position, so that it only has to be asked once per position.
+
+    NOTES:
+    -The opponent must be looking at the same Board object the model is asked about.
+    -Replies with a probability of 0 are left out.
+    -With canonical keys, replies are kept for the canonical form of each position (see
+    Board.get_canonical_key), so a position and its rotated twin with the other player to
+    move share an entry.  This is only right for opponents which play the same either way round.
+    """
+
+    def __init__(self, opponent, cache_file=None, canonical=False):
+        """
+        Initializes the model for the given opponent, loading the cached replies from
+        cache_file if it exists and was made for the same opponent.
+        """
+        self.opponent = opponent
+        self.cache_file = cache_file
+        self.canonical = canonical
+        self.opponent_description = opponent.get_description()
+        self.replies = {}
+        self.num_cache_hits = 0
+        self.num_cache_misses = 0
+
+        if cache_file is not None and os.path.exists(cache_file):
+            self.load_replies(cache_file)
+
+    def get_replies(self, board):
+        """
+        Gets the opponent's possible replies in the board's current configuration, in the form:
+        [[move1, probability1], [move2, probability2], ...]
+        """
+        if self.canonical:
+            return self.get_canonical_replies(board)
+
+        key = board.get_position_key()
+        answer = self.replies.get(key)
+        if answer is not None:
+            self.num_cache_hits = self.num_cache_hits + 1
+            return answer
+
+        self.num_cache_misses = self.num_cache_misses + 1
+        answer = [[move, probability] for move, probability in self.opponent.get_move_distribution()
+                  if probability > 0]
+        self.replies[key] = answer
+        return answer
+
+    def get_canonical_replies(self, board):
+        """
+        Gets the same replies as get_replies, keeping them by the position's canonical key.
+        """
+        key = board.get_canonical_key()
+        canonical_answer = self.replies.get(key)
+        if canonical_answer is not None:
+            self.num_cache_hits = self.num_cache_hits + 1
+            if board.player_turn:
+                return canonical_answer
+            return [[board.get_move_from_canonical(move), probability] for move, probability in canonical_answer]
+
+        self.num_cache_misses = self.num_cache_misses + 1
+        answer = [[move, probability] for move, probability in self.opponent.get_move_distribution()
+                  if probability > 0]
+        self.replies[key] = [[board.get_canonical_move(move), probability] for move, probability in answer]
+        return answer
+
+    def save_replies(self, file_name=None):
+        """
+        Saves the cached replies, along with the opponent's description, to a specified json
+        file (by default the cache file).
+        """
+        if file_name is None:
+            file_name = self.cache_file
+        with open(file_name, 'w') as fp:
+            json.dump({"opponent": self.opponent_description, "canonical": self.canonical,
+                       "replies": {k.hex(): v for k, v in self.replies.items()}}, fp)
+
+    def load_replies(self, file_name):
+        """
+        Loads cached replies from a desired json file, returning whether they were loaded.
+        Replies saved for a different opponent (or kind of key) aren't loaded.
+        """
+        with open(file_name, 'r') as fp:
+            saved = json.load(fp)
+        if saved.get("opponent") != self.opponent_description or saved.get("canonical") != self.canonical:
+            return False
+        self.replies = {bytes.fromhex(k): v for k, v in saved["replies"].items()}
+        return True
@@ -0,0 +1,181 @@
+"""
+Distributed self-play training for Q_Learning_AI.
+
+A set of worker processes (actors) each play games against a configured opponent
+using a snapshot of the learner's transitions, and record the Q-learning updates
+they would have made instead of applying them.  The learner (the calling process)
+applies those batches to the master table in a fixed order and hands out a
+refreshed snapshot after every round.
+
+The actors do all of the work of an update (the reward, and the best value out of the
+next state, looked up in their snapshot), so applying one is a single increment for the
+learner.
+
+NOTES:
+-Batches are sent back with every state tuple stored once, and transitions/updates
+referring to states by their index in that list.
+-Given the same seed, number of workers and sync interval, training is reproducible.
+-The bootstrap values come from the snapshot, so they can be up to a round out of date.
+-Updates are applied directly, even if the learner has a Replay_Buffer.
+"""
+
+import random
+from collections import ChainMap
+from multiprocessing import Pool
+
+from Board import Board
+from Player import build_player
+from Transition_Table import Transition_Table
+from AI import Q_Learning_AI, play_game, reward_function
+
+
+class Q_Learning_Actor(Q_Learning_AI):
+    """
+    A Q_Learning_AI which plays from a read-only snapshot of the transitions and
+    records the updates it would make, so they can be applied by the learner.
+    """
+
+    def __init__(self, the_player_id, the_learning_rate, the_discount_factor, snapshot,
+                 the_random_move_probability=0, the_board=None, the_canonical_states=False):
+        Q_Learning_AI.__init__(self, the_player_id, the_learning_rate, the_discount_factor,
+                               the_random_move_probability=the_random_move_probability, the_board=the_board,
+                               the_canonical_states=the_canonical_states)
+        # Newly discovered transitions go into the first map, leaving the snapshot untouched
+        self.transitions = ChainMap(Transition_Table(), snapshot)
+        self.recorded_updates = []
+
+        # The best value out of each start state in the snapshot, found in one pass
+        self.snapshot_max_values = {}
+        for (start_state, _), value in snapshot.items():
+            if value > self.snapshot_max_values.get(start_state, float("-inf")):
+                self.snapshot_max_values[start_state] = value
+
+    def get_optimal_potential_value(self, depth, state=None):
+        """
+        Gets the best value out of a state, from the snapshot and the newly discovered transitions.
+        """
+        if state is None:
+            state = self.get_states_from_boards_spots([self.board.spots])[0]
+        snapshot_value = self.snapshot_max_values.get(state)
+        new_value = self.transitions.maps[0].get_start_state_max(state)
+        if new_value is None:
+            return snapshot_value
+        if snapshot_value is None:
+            return new_value
+        return max(snapshot_value, new_value)
+
+    def update_transition(self, transition, cur_state, game_over=False):
+        """
+        Records the update, with its reward and bootstrap value, instead of applying it.
+        """
+        max_future_value = None
+        if not game_over:
+            max_future_value = self.get_optimal_potential_value(1, cur_state)
+        self.recorded_updates.append((transition, reward_function(transition[0], cur_state), max_future_value))
+
+    def get_batch(self):
+        """
+        Gets the transitions discovered and updates recorded since the last call, in the form:
+        [states, new_transitions, updates]
+        where new_transitions is a list of (start_index, end_index) and updates is a list
+        of (start_index, end_index, reward, max_future_value), as given to Q_Learning_AI.apply_update .
+        """
+        state_indices = {}
+
+        def index_of(state):
+            if state_indices.get(state) is None:
+                state_indices[state] = len(state_indices)
+            return state_indices[state]
+
+        new_transitions = [(index_of(k[0]), index_of(k[1])) for k in self.transitions.maps[0]]
+        updates = [(index_of(transition[0]), index_of(transition[1]), reward, max_future_value)
+                   for transition, reward, max_future_value in self.recorded_updates]
+
+        self.transitions.maps[0] = Transition_Table()
+        self.recorded_updates = []
+
+        return [list(state_indices), new_transitions, updates]
+
+
+def apply_batch(learner, batch, initial_transition_value=10):
+    """
+    Applies a batch created by Q_Learning_Actor.get_batch to the learner's transitions.
+    """
+    states, new_transitions, updates = batch
+    for start, end in new_transitions:
+        learner.transitions.setdefault((states[start], states[end]), initial_transition_value)
+
+    for start, end, reward, max_future_value in updates:
+        learner.apply_update((states[start], states[end]), reward, max_future_value)
+
+
+def play_actor_games(task):
+    """
+    Plays a number of games in a worker process and returns [batch, outcomes], where
+    outcomes is in the format returned by play_n_games.
+
+    task is in the form: [actor_info, snapshot, opponent_config, num_games, move_limit, seed]
+    with actor_info being [player_id, learning_rate, discount_factor, random_move_probability, canonical_states].
+    """
+    actor_info, snapshot, opponent_config, num_games, move_limit, seed = task
+    if seed is not None:
+        random.seed(seed)
+
+    actor = Q_Learning_Actor(actor_info[0], actor_info[1], actor_info[2], snapshot,
+                             the_random_move_probability=actor_info[3], the_canonical_states=actor_info[4])
+    opponent = build_player(opponent_config)
+    if actor.player_id:
+        player1, player2 = actor, opponent
+    else:
+        player1, player2 = opponent, actor
+
+    game_board = Board()
+    player1.set_board(game_board)
+    player2.set_board(game_board)
+
+    outcomes = [play_game(player1, player2, game_board, move_limit) for _ in range(num_games)]
+
+    return [actor.get_batch(), outcomes]
+
+
+def train_in_parallel(learner, opponent_config, num_games, move_limit, num_workers=4, sync_interval=10,
+                      seed=None):
+    """
+    Trains the given Q_Learning_AI by having num_workers processes play a total of num_games
+    games against the player built from opponent_config (see Player.build_player).  Every
+    worker plays sync_interval games per round from the same snapshot of the learner's
+    transitions, after which the learner applies their batches and a new snapshot is sent out.
+
+    Returns the outcomes of the games in the format returned by play_n_games, ordered by
+    round and then by worker.
+    """
+    actor_info = [learner.player_id, learner.learning_rate, learner.discount_factor,
+                  learner.random_move_probability, learner.canonical_states]
+
+    outcomes = []
+    round_number = 0
+    with Pool(num_workers) as pool:
+        while len(outcomes) < num_games:
+            # A plain dict, so the workers don't rebuild the Transition_Table's statistics
+            snapshot = dict(learner.transitions)
+            tasks = []
+            games_left = num_games - len(outcomes)
+            for worker in range(num_workers):
+                worker_games = min(sync_interval, games_left)
+                if worker_games == 0:
+                    break
+                games_left = games_left - worker_games
+                if seed is None:
+                    worker_seed = None
+                else:
+                    worker_seed = str(seed) + ":" + str(round_number) + ":" + str(worker)
+                tasks.append([actor_info, snapshot, opponent_config, worker_games, move_limit,
+                              worker_seed])
+
+            for batch, worker_outcomes in pool.map(play_actor_games, tasks):
+                apply_batch(learner, batch)
+                outcomes.extend(worker_outcomes)
+
+            round_number = round_number + 1
+
+    return outcomes
@@ -0,0 +1,74 @@
+"""
+Value iteration sweeps split across worker processes.
+
+The states of a Transition_Graph are split into one contiguous partition per worker.
+Two value arrays live in shared memory: every sweep, each worker backs up its
+partition from one array into the other (Jacobi style) and returns the largest
+change it made, and the largest of those decides if the values have converged.
+Because every backup only reads the previous sweep's values, the result is the
+same as solving the graph in one process.
+"""
+
+import numpy as np
+from multiprocessing import Pool, shared_memory
+
+# Set in each worker process by init_worker
+worker_graph = None
+worker_memory = None
+worker_values = None
+
+
+def init_worker(graph, memory_name):
+    global worker_graph, worker_memory, worker_values
+    worker_graph = graph
+    worker_memory = shared_memory.SharedMemory(name=memory_name)
+    worker_values = np.ndarray((2, len(graph)), dtype=np.float64, buffer=worker_memory.buf)
+
+
+def backup_partition(task):
+    """
+    Backs up the states first_state to last_state from the values in row source of the
+    shared values into the other row, and returns the largest change in value.
+
+    task is in the form: [first_state, last_state, source]
+    """
+    first_state, last_state, source = task
+    if first_state == last_state:
+        return 0
+    new_values = worker_graph.backup_states(worker_values[source], first_state, last_state)
+    delta = np.max(np.abs(new_values - worker_values[source, first_state:last_state]))
+    worker_values[1 - source, first_state:last_state] = new_values
+    return delta
+
+
+def solve_in_parallel(graph, values, theta=0.0001, num_workers=4):
+    """
+    Repeats Bellman backups of all the states in the given Transition_Graph, split across
+    num_workers processes, until no value changes by theta or more.  Returns the final values,
+    starting from the given ones.
+    """
+    num_states = len(graph)
+    boundaries = np.linspace(0, num_states, num_workers + 1).astype(np.int64)
+
+    memory = shared_memory.SharedMemory(create=True, size=max(16 * num_states, 1))
+    try:
+        shared_values = np.ndarray((2, num_states), dtype=np.float64, buffer=memory.buf)
+        shared_values[0] = values
+
+        source = 0
+        with Pool(num_workers, initializer=init_worker, initargs=(graph, memory.name)) as pool:
+            while True:
+                tasks = [[boundaries[j], boundaries[j + 1], source] for j in range(num_workers)]
+                delta = max(pool.map(backup_partition, tasks))
+                source = 1 - source
+
+                if delta < theta:
+                    break
+
+        answer = shared_values[source].copy()
+        del shared_values
+    finally:
+        memory.close()
+        memory.unlink()
+
+    return answer
@@ -16,6 +16,8 @@ class Player:
     1) Create set playerID method
     """
 
+    move_deadline = None
+
     def set_board(self, the_board):
         """
         Sets the Board object which is known by the AI.
@@ -33,4 +35,57 @@ class Player:
         """
         Gets the desired next move from the AI.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def get_move_distribution(self):
+        """
+        Gets every move the AI might make from the current board configuration along
+        with the probability of it doing so, in the form:
+        [[move1, probability1], [move2, probability2], ...]
+        Should be overridden by AI which don't always make the same move.
+        """
+        return [[self.get_next_move(), 1]]
+
+    def get_learned_data_digest(self):
+        """
+        Gets a digest (a string) of anything the AI has learned which changes how it plays, so
+        that AI which only differ in what they learned can be told apart (e.g. by
+        Value_Iteration_AI's solution cache).  Should be overridden by AI which learn.
+        """
+        return ""
+
+    def get_description(self):
+        """
+        Gets a string describing how the AI plays: its class, any attributes which are numbers
+        or strings, and the digest of what it has learned (see get_learned_data_digest).
+        """
+        configuration = sorted((k, v) for k, v in vars(self).items() if isinstance(v, (bool, int, float, str)))
+        return repr([type(self).__name__, configuration, self.get_learned_data_digest()])
+
+    def set_move_deadline(self, deadline):
+        """
+        Sets the time (a time.perf_counter() value) the AI's next move should be made by, or None
+        for no deadline.  AI which can stop searching early should check self.move_deadline .
+        """
+        self.move_deadline = deadline
+
+    def enable_profiling(self, profiler, name):
+        """
+        Has the time this AI spends choosing moves and learning attributed to the given
+        name (e.g. "player1") by a Profiling.Profiler .
+        """
+        from Profiling import profile_player
+        profile_player(self, profiler, name)
+
+
+def build_player(player_config):
+    """
+    Builds a player from a picklable configuration, so that a player can be
+    recreated inside another process instead of sharing an instance.
+
+    player_config is in the form: (player_class, args) or (player_class, args, kwargs)
+    e.g. (Alpha_beta, (False, 2)) or (Q_Learning_AI, (True, .005, .3), {"the_random_move_probability": .25})
+    """
+    if len(player_config) > 2:
+        return player_config[0](*player_config[1], **player_config[2])
+    return player_config[0](*player_config[1])
@@ -0,0 +1,272 @@
+"""
+Profiling of games, with the time attributed to each player and to the phase of play it
+was spent in:
+-move_generation: Board.get_possible_next_moves (on any board)
+-evaluation: the rest of choosing a move (get_next_move)
+-learning_update: updating what a player has learned (game_completed, update_transition, ...)
+Time outside of any player is attributed to "game_loop".
+
+There are two modes:
+-"cprofile": deterministic profiling, with one cProfile profile per player and phase, which
+can be saved as pstats files
+-"sampling": a background thread records the stack of the profiled thread every interval
+seconds, which can be saved as collapsed stacks (one "frame;frame;... count" line per stack)
+for flame graph tools
+
+NOTES:
+-Profile_Results from different processes (see Match_Runner.profile_n_games_in_parallel)
+can be merged with Profile_Results.merge .
+-While a Profiler is running, Board.get_possible_next_moves is wrapped for the whole process.
+-A player stays wrapped after its Profiler stops, but then only pays for a list append and pop
+per call.
+"""
+
+import os
+import sys
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+from Board import Board
+
+GAME_LOOP = "game_loop"
+LEARNING_METHODS = ["game_completed", "update_transition", "update_weights", "replay_experience"]
+
+
+class Stats_Holder:
+    """
+    Holds a raw stats dictionary in the form pstats.Stats can load from.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def merge_stats(stats1, stats2):
+    """
+    Gets the raw pstats dictionary combining two raw pstats dictionaries.
+    """
+    if len(stats1) == 0:
+        return dict(stats2)
+    if len(stats2) == 0:
+        return dict(stats1)
+    merged = pstats.Stats(Stats_Holder(dict(stats1)))
+    merged.add(Stats_Holder(dict(stats2)))
+    return merged.stats
+
+
+class Profile_Results:
+    """
+    A class to hold the results of profiling: raw pstats dictionaries (cprofile mode) and collapsed
+    stack counts (sampling mode), each keyed by "player;phase".
+    """
+
+    def __init__(self, mode, stats=None, stacks=None, interval=.005):
+        self.mode = mode
+        self.interval = interval
+        self.stats = stats or {}
+        self.stacks = stacks or Counter()
+
+    def merge(self, other):
+        """
+        Adds the results of another Profile_Results (e.g. from another process) to these.
+        """
+        for key, stats in other.stats.items():
+            self.stats[key] = merge_stats(self.stats.get(key, {}), stats)
+        self.stacks.update(other.stacks)
+
+    def get_stats(self, key=None):
+        """
+        Gets a pstats.Stats of a player and phase (e.g. "player1;evaluation"), or of everything if no
+        key is given.
+        """
+        combined = {}
+        for stats_key, stats in self.stats.items():
+            if key is None or stats_key == key:
+                combined = merge_stats(combined, stats)
+        return pstats.Stats(Stats_Holder(combined))
+
+    def get_phase_times(self):
+        """
+        Gets the time spent in each player and phase, in the form: {key: seconds}
+        In sampling mode this is the number of samples times the sampling interval.
+        """
+        if self.mode == "cprofile":
+            return {key: pstats.Stats(Stats_Holder(dict(stats))).total_tt for key, stats in self.stats.items()}
+
+        answer = Counter()
+        for stack, count in self.stacks.items():
+            player, phase, _ = (stack + ";;").split(";", 2)
+            answer[player + ";" + phase] = answer[player + ";" + phase] + count * self.interval
+        return dict(answer)
+
+    def save(self, prefix):
+        """
+        Saves the results as one pstats file per player and phase (prefix.player.phase.pstats) in
+        cprofile mode, or a collapsed stacks file (prefix.collapsed) in sampling mode.  Returns the
+        names of the files written.
+        """
+        file_names = []
+        for key, stats in self.stats.items():
+            file_name = prefix + "." + key.replace(";", ".") + ".pstats"
+            with open(file_name, 'wb') as fp:
+                marshal.dump(stats, fp)
+            file_names.append(file_name)
+
+        if len(self.stacks) != 0:
+            file_name = prefix + ".collapsed"
+            with open(file_name, 'w') as fp:
+                for stack, count in sorted(self.stacks.items()):
+                    fp.write(stack + " " + str(count) + "\n")
+            file_names.append(file_name)
+        return file_names
+
+    def print_summary(self):
+        """
+        Prints the time spent in each player and phase.
+        """
+        for key, seconds in sorted(self.get_phase_times().items()):
+            print(key.replace(";", " ").ljust(35), "%.4fs" % seconds)
+
+
+class Profiler:
+    """
+    A class to profile the thread which starts it, attributing time to whichever player and phase
+    is currently entered (see enter and profile_player).
+    """
+
+    def __init__(self, mode="cprofile", interval=0.005):
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError("Unknown profiling mode: " + str(mode))
+        self.mode = mode
+        self.interval = interval
+        self.key_stack = [GAME_LOOP + ";other"]
+        self.profiles = {}
+        self.stacks = Counter()
+        self.thread_id = None
+        self.sampler = None
+        self.running = False
+        self.original_get_possible_next_moves = None
+
+    def get_profile(self, key):
+        if self.profiles.get(key) is None:
+            self.profiles[key] = cProfile.Profile()
+        return self.profiles[key]
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.running = True
+        self.wrap_move_generation()
+        if self.mode == "cprofile":
+            self.get_profile(self.key_stack[-1]).enable()
+        else:
+            self.sampler = threading.Thread(target=self.sample, daemon=True)
+            self.sampler.start()
+
+    def stop(self):
+        """
+        Stops profiling and gets the results as a Profile_Results.
+        """
+        self.running = False
+        if self.mode == "cprofile":
+            self.get_profile(self.key_stack[-1]).disable()
+        else:
+            self.sampler.join()
+        self.unwrap_move_generation()
+
+        stats = {}
+        for key, profile in self.profiles.items():
+            profile.create_stats()
+            stats[key] = profile.stats
+        return Profile_Results(self.mode, stats, self.stacks, self.interval)
+
+    def enter(self, key):
+        """
+        Starts attributing time to the given key ("player;phase") until the matching call to leave.
+        """
+        if self.running and self.mode == "cprofile":
+            self.get_profile(self.key_stack[-1]).disable()
+            self.key_stack.append(key)
+            self.get_profile(key).enable()
+        else:
+            self.key_stack.append(key)
+
+    def leave(self):
+        if self.running and self.mode == "cprofile":
+            self.get_profile(self.key_stack.pop()).disable()
+            self.get_profile(self.key_stack[-1]).enable()
+        else:
+            self.key_stack.pop()
+
+    def get_player(self):
+        return self.key_stack[-1].split(";")[0]
+
+    def sample(self):
+        """
+        Records the stack of the profiled thread every interval seconds, until stopped.
+        """
+        while self.running:
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(code.co_name + " (" + os.path.basename(code.co_filename) + ":" +
+                              str(code.co_firstlineno) + ")")
+                frame = frame.f_back
+            frames.append(self.key_stack[-1])
+            stack = ";".join(reversed(frames))
+            self.stacks[stack] = self.stacks[stack] + 1
+
+    def wrap_move_generation(self):
+        """
+        Wraps Board.get_possible_next_moves so that calls to it are attributed to the move
+        generation phase of whichever player is making them.
+        """
+        original = Board.get_possible_next_moves
+        self.original_get_possible_next_moves = original
+        profiler = self
+
+        def get_possible_next_moves(board, *args, **kwargs):
+            profiler.enter(profiler.get_player() + ";move_generation")
+            try:
+                return original(board, *args, **kwargs)
+            finally:
+                profiler.leave()
+
+        Board.get_possible_next_moves = get_possible_next_moves
+
+    def unwrap_move_generation(self):
+        Board.get_possible_next_moves = self.original_get_possible_next_moves
+
+
+def wrap_method(player, method_name, profiler, key):
+    """
+    Replaces a method of one player object with one which runs it with time attributed to key.
+    """
+    method = getattr(player, method_name)
+
+    def profiled_method(*args, **kwargs):
+        profiler.enter(key)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            profiler.leave()
+
+    setattr(player, method_name, profiled_method)
+
+
+def profile_player(player, profiler, name):
+    """
+    Has a player's moves and learning attributed to the given name in the profiler's results.
+    """
+    wrap_method(player, "get_next_move", profiler, name + ";evaluation")
+    for method_name in LEARNING_METHODS:
+        if hasattr(player, method_name):
+            wrap_method(player, method_name, profiler, name + ";learning_update")
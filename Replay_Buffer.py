@@ -0,0 +1,56 @@
+"""
+A fixed size ring buffer of Q-learning experience, stored in NumPy arrays.
+"""
+
+import numpy as np
+
+
+class Replay_Buffer:
+    """
+    A class to store the most recent transitions experienced by a learning AI, so that
+    they can be sampled in minibatches and reused.
+
+    Each entry holds the transition (start_state, end_state), the reward received for it,
+    the state the board was in when it was next the AI's turn and weather the game ended.
+    """
+    STATE_SIZE = 7
+
+    def __init__(self, capacity, seed=None):
+        """
+        Initializes an empty buffer which holds up to capacity entries.
+        """
+        self.capacity = capacity
+        self.start_states = np.zeros((capacity, self.STATE_SIZE), dtype=np.int16)
+        self.end_states = np.zeros((capacity, self.STATE_SIZE), dtype=np.int16)
+        self.next_states = np.zeros((capacity, self.STATE_SIZE), dtype=np.int16)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.game_overs = np.zeros(capacity, dtype=np.bool_)
+        self.size = 0
+        self.position = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, transition, reward, next_state, game_over=False):
+        """
+        Adds an entry to the buffer, overwriting the oldest entry once the buffer is full.
+        """
+        self.start_states[self.position] = transition[0]
+        self.end_states[self.position] = transition[1]
+        self.next_states[self.position] = next_state
+        self.rewards[self.position] = reward
+        self.game_overs[self.position] = game_over
+
+        self.position = (self.position + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size = self.size + 1
+
+    def sample(self, batch_size):
+        """
+        Gets a uniformly random minibatch of entries (with replacement) in the form:
+        [start_states, end_states, rewards, next_states, game_overs]
+        """
+        indices = self.rng.integers(0, self.size, batch_size)
+        return [self.start_states[indices], self.end_states[indices], self.rewards[indices],
+                self.next_states[indices], self.game_overs[indices]]
@@ -0,0 +1,103 @@
+"""
+A read-only copy of a Q_Learning_AI's transitions which lives in shared memory, so
+that any number of evaluation processes can use one copy of it.
+
+NOTES:
+-Each state is packed into 28 bits (4 bits per characteristic), and each transition
+into a 56 bit key.  The keys are stored sorted, so lookups are a binary search.
+-The shared memory block is laid out as: [num_transitions, keys..., values...]
+"""
+
+import numpy as np
+from multiprocessing import shared_memory
+
+
+def encode_state(state):
+    """
+    Packs a state tuple (as made by get_states_from_boards_spots) into an integer.
+    """
+    answer = 0
+    for characteristic in state:
+        answer = (answer << 4) | characteristic
+    return answer
+
+
+def encode_transition(start_state, end_state):
+    """
+    Packs a transition between two state tuples into an integer.
+    """
+    return (encode_state(start_state) << 28) | encode_state(end_state)
+
+
+class Shared_Transition_Table:
+    """
+    A class to hold a read-only table of transition values in shared memory.  Pickling
+    an instance (e.g. sending it to a worker process) only sends the name of the block,
+    and the receiving process attaches to the same memory.
+    """
+
+    def __init__(self, name):
+        """
+        Attaches to an existing shared table with the given name.
+        """
+        self.memory = shared_memory.SharedMemory(name=name)
+        self.is_owner = False
+        self.num_transitions = int(np.ndarray((1,), dtype=np.int64, buffer=self.memory.buf)[0])
+        self.keys = np.ndarray((self.num_transitions,), dtype=np.int64, buffer=self.memory.buf, offset=8)
+        self.values = np.ndarray((self.num_transitions,), dtype=np.float64, buffer=self.memory.buf,
+                                 offset=8 + 8 * self.num_transitions)
+
+    @classmethod
+    def create(cls, transitions, name=None):
+        """
+        Copies the given transitions dictionary into a new shared memory block and returns
+        the table for it.  The process which creates the table is responsible for calling unlink().
+        """
+        keys = np.array([encode_transition(k[0], k[1]) for k in transitions], dtype=np.int64)
+        values = np.array(list(transitions.values()), dtype=np.float64)
+        order = np.argsort(keys)
+
+        memory = shared_memory.SharedMemory(name=name, create=True, size=8 + 16 * max(len(keys), 1))
+        np.ndarray((1,), dtype=np.int64, buffer=memory.buf)[0] = len(keys)
+        np.ndarray((len(keys),), dtype=np.int64, buffer=memory.buf, offset=8)[:] = keys[order]
+        np.ndarray((len(keys),), dtype=np.float64, buffer=memory.buf, offset=8 + 8 * len(keys))[:] = values[order]
+
+        table = cls(memory.name)
+        table.is_owner = True
+        memory.close()
+        return table
+
+    def __reduce__(self):
+        return Shared_Transition_Table, (self.memory.name,)
+
+    def __len__(self):
+        return self.num_transitions
+
+    def get_values(self, start_state, end_states, default_value):
+        """
+        Gets the values of the transitions from start_state to each of the given end states,
+        with default_value given for any transition not in the table.
+        """
+        if self.num_transitions == 0:
+            return np.full(len(end_states), default_value, dtype=np.float64)
+
+        start_key = encode_state(start_state) << 28
+        keys = np.array([start_key | encode_state(state) for state in end_states], dtype=np.int64)
+
+        positions = np.minimum(np.searchsorted(self.keys, keys), self.num_transitions - 1)
+        return np.where(self.keys[positions] == keys, self.values[positions], default_value)
+
+    def close(self):
+        """
+        Detaches this process from the shared memory.
+        """
+        self.keys = None
+        self.values = None
+        self.memory.close()
+
+    def unlink(self):
+        """
+        Frees the shared memory.  Should only be called by the process which created the table,
+        once every process has closed it.
+        """
+        self.memory.unlink()
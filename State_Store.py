@@ -0,0 +1,60 @@
+"""
+A store giving every discovered position a dense index, with a value for each
+position kept in a NumPy array aligned to those indices.
+"""
+
+import numpy as np
+
+
+class State_Store:
+    """
+    A class to map hashable position keys (see Board.get_position_key) to dense indices
+    in O(1), and to hold a float value for each of them.
+
+    NOTES:
+    -The values array grows by doubling, so self.values may be longer than the number of
+    states.  Use get_values() to get only the values of known states.
+    """
+
+    def __init__(self, initial_capacity=1024):
+        """
+        Initializes an empty store.
+        """
+        self.indices = {}
+        self.keys = []
+        self.values = np.zeros(initial_capacity, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.indices
+
+    def find(self, key):
+        """
+        Gets the index of the given key, or None if it's not in the store.
+        """
+        return self.indices.get(key)
+
+    def add(self, key, value=0):
+        """
+        Gets the index of the given key, adding it with the given value if it's not in the store.
+        Returns [index, is_new].
+        """
+        index = self.indices.get(key)
+        if index is not None:
+            return [index, False]
+
+        index = len(self.keys)
+        if index == len(self.values):
+            self.values = np.concatenate((self.values, np.zeros(len(self.values), dtype=np.float64)))
+        self.indices[key] = index
+        self.keys.append(key)
+        self.values[index] = value
+        return [index, True]
+
+    def get_values(self):
+        """
+        Gets the values of the states in the store, in order of their indices.
+        """
+        return self.values[:len(self.keys)]
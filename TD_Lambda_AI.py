@@ -0,0 +1,139 @@
+"""
+A checkers playing AI which learns a linear value function over the states made by
+Board.get_states_from_boards_spots, using TD(lambda) with eligibility traces.
+"""
+
+import random
+import json
+import hashlib
+import numpy as np
+from Player import Player
+from AI import reward_function
+
+
+class TD_Lambda_AI(Player):
+    """
+    A class representing a checkers playing AI which scores the states its possible moves
+    lead to with a weight vector over their characteristics (plus a bias).  Unlike
+    Q_Learning_AI it doesn't store anything per state, so its memory doesn't grow
+    with training, and states it has never seen are scored from similar ones.
+
+    NOTES:
+    -The values learned are for the states after the AI's moves (afterstates), so picking a
+    move is one matrix-vector product over all of the possible next states.
+    """
+    # Largest value of each characteristic, used to scale the features to [0, 1]
+    FEATURE_SCALES = np.array([12, 12, 12, 12, 8, 7, 7], dtype=np.float64)
+
+    def __init__(self, the_player_id, the_learning_rate, the_discount_factor, the_trace_decay, info_location=None,
+                 the_random_move_probability=0, the_board=None):
+        """
+        Initialize the instance variables to be stored by the AI.
+        """
+        self.player_id = the_player_id
+        self.learning_rate = the_learning_rate
+        self.discount_factor = the_discount_factor
+        self.trace_decay = the_trace_decay
+        self.random_move_probability = the_random_move_probability
+        self.board = the_board
+        self.training = True
+        self.pre_last_move_state = None
+        self.last_features = None
+        self.weights = np.zeros(len(self.FEATURE_SCALES) + 1)
+        self.eligibility_traces = np.zeros(len(self.weights))
+        if info_location is not None:
+            self.load_weights(info_location)
+
+    def set_random_move_probability(self, probability):
+        """
+        Sets the random move probability for the AI.
+        """
+        self.random_move_probability = probability
+
+    def set_learning_rate(self, the_learning_rate):
+        """
+        Sets the learning rate for the AI.
+        """
+        self.learning_rate = the_learning_rate
+
+    def set_training(self, training):
+        """
+        Sets weather the AI is training.  When it's not, the weights are never updated.
+        """
+        self.training = training
+        self.pre_last_move_state = None
+        self.last_features = None
+        self.eligibility_traces[:] = 0
+
+    def get_features(self, boards_spots):
+        """
+        Gets a matrix with a row of features for each of the given board spots.
+        """
+        states = np.array(self.board.get_states_from_boards_spots(boards_spots, self.player_id), dtype=np.float64)
+        return np.hstack((np.ones((len(states), 1)), states / self.FEATURE_SCALES))
+
+    def update_weights(self, reward, future_value):
+        """
+        Applies the TD(lambda) update for the last move, given the reward received since it
+        was made and the value of the state the AI moves to next (0 if the game ended).
+        """
+        td_error = reward + self.discount_factor * future_value - np.dot(self.weights, self.last_features)
+        self.eligibility_traces = self.discount_factor * self.trace_decay * self.eligibility_traces + self.last_features
+        self.weights = self.weights + self.learning_rate * td_error * self.eligibility_traces
+
+    def game_completed(self):
+        """
+        Update the weights with a completed game before the board is cleared.
+        """
+        if self.training and self.last_features is not None:
+            cur_state = self.board.get_states_from_boards_spots([self.board.spots], self.player_id)[0]
+            self.update_weights(reward_function(self.pre_last_move_state, cur_state), 0)
+
+        self.pre_last_move_state = None
+        self.last_features = None
+        self.eligibility_traces[:] = 0
+
+    def get_next_move(self):
+        """
+        Gets the desired next move from the AI, and (if training) updates the weights for
+        its previous move.
+        """
+        possible_next_moves = self.board.get_possible_next_moves()
+        features = self.get_features(self.board.get_potential_spots_from_moves(possible_next_moves))
+        values = features.dot(self.weights)
+
+        if random.random() < self.random_move_probability:
+            move_index = random.randint(0, len(possible_next_moves) - 1)
+        else:
+            best_indices = np.flatnonzero(values == values.max())
+            move_index = int(best_indices[random.randint(0, len(best_indices) - 1)])
+
+        if self.training:
+            cur_state = self.board.get_states_from_boards_spots([self.board.spots], self.player_id)[0]
+            if self.last_features is not None:
+                self.update_weights(reward_function(self.pre_last_move_state, cur_state), values[move_index])
+
+            self.pre_last_move_state = cur_state
+            self.last_features = features[move_index]
+
+        return possible_next_moves[move_index]
+
+    def get_learned_data_digest(self):
+        """
+        Gets a digest of the weights the AI plays by.
+        """
+        return hashlib.sha1(self.weights.tobytes()).hexdigest()
+
+    def save_weights(self, file_name="weights.json"):
+        """
+        Saves the current weights to a specified json file.
+        """
+        with open(file_name, 'w') as fp:
+            json.dump(self.weights.tolist(), fp)
+
+    def load_weights(self, file_name):
+        """
+        Loads weights from a desired json file.
+        """
+        with open(file_name, 'r') as fp:
+            self.weights = np.array(json.load(fp), dtype=np.float64)
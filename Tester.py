@@ -1,14 +1,25 @@
 """
 @author: Sam Ragusa
 
-IMPORTANT NOTE:
--Since I am currently executing the AI checkers games from the file AI.py,
-the code at the end of that file needs to be commented out before execution of these tests.  This includes all code that is not defining functions, or classes. 
+NOTE:
+-Importing AI.py no longer builds or runs any players (that's done in its run function,
+or from the command line with Checkers_CLI.py), so these tests can be run as they are.
 """
 
 
+import os
+import random
+import tempfile
+
 from Board import Board
-from AI import Alpha_beta
+from AI import Alpha_beta, Q_Learning_AI, play_n_games
+from Transition_Table import Transition_Table
+from Draw_Rules import Draw_Rules, DRAWN_BY_RULE
+from Game_Hooks import Game_Hook
+from Game_Archive import Game_Archive, Game_Recording_Hook, read_pdn_games, get_pdn_move
+import Batched_Simulator
+from Tournament import get_sprt_llr
+from Value_Iteration_AI import Value_Iteration_AI
 
 
 def switch_board_players(board):
@@ -147,6 +158,232 @@ def test_board_functions_not_next_move():
         print_test_results([board.spots],[old_spots])
 
 
+def get_random_game_boards(num_games, seed=0, max_plies=150):
+    """
+    Gets a copy of the Board after every ply of num_games games of random moves.
+    """
+    random.seed(seed)
+    answer = []
+    for _ in range(num_games):
+        board = Board()
+        for _ in range(max_plies):
+            moves = board.get_possible_next_moves()
+            if len(moves) == 0:
+                break
+            answer.append(Board(old_spots=[row[:] for row in board.spots], the_player_turn=board.player_turn))
+            board.make_move(moves[random.randint(0, len(moves) - 1)])
+    return answer
+
+
+def test_batched_simulator():
+    """
+    Checks that the batched move generation and move making of Batched_Simulator give the same
+    moves and resulting configurations as Board, in positions from random games.
+    """
+    computed_outputs = []
+    desired_outputs = []
+    for board in get_random_game_boards(10):
+        positions = Batched_Simulator.get_positions_from_spots(board.spots)
+        move_games, paths, captures, offsets = Batched_Simulator.get_possible_next_moves(positions, board.player_turn)
+        computed_outputs.append([bytes(path[path >= 0].tolist()) for path in paths])
+        desired_outputs.append([board.pack_move(move) for move in board.get_possible_next_moves()])
+
+        positions = Batched_Simulator.get_positions_from_spots(board.spots, len(paths))
+        Batched_Simulator.make_moves(positions, paths, captures)
+        computed_outputs.append([Batched_Simulator.get_spots_from_position(position) for position in positions])
+        desired_outputs.append(board.get_potential_spots_from_moves(board.get_possible_next_moves()))
+
+    print_test_results(computed_outputs, desired_outputs)
+
+
+def test_canonical_moves():
+    """
+    Checks that in positions with player 2 to move, the canonical moves (see Board.get_canonical_move)
+    are the moves of the canonical configuration, and that get_move_from_canonical maps them back.
+    """
+    computed_outputs = []
+    desired_outputs = []
+    for board in get_random_game_boards(10, seed=1):
+        if board.player_turn:
+            continue
+        moves = board.get_possible_next_moves()
+        canonical_board = Board(old_spots=board.get_canonical_spots(), the_player_turn=True)
+
+        computed_outputs.append(sorted(board.pack_move(board.get_canonical_move(move)) for move in moves))
+        desired_outputs.append(sorted(board.pack_move(move) for move in canonical_board.get_possible_next_moves()))
+        computed_outputs.append([board.get_move_from_canonical(board.get_canonical_move(move)) for move in moves])
+        desired_outputs.append(moves)
+
+    print_test_results(computed_outputs, desired_outputs)
+
+
+def test_transition_table():
+    """
+    Checks the maximum, minimum and per start state maximum kept by Transition_Table against
+    ones found from all of its values, as values are increased, decreased and deleted.
+    """
+    random.seed(2)
+    table = Transition_Table()
+    values = {}
+    computed_outputs = []
+    desired_outputs = []
+    for j in range(3000):
+        key = (random.randint(0, 20), random.randint(0, 10))
+        if key in values and random.random() < .2:
+            del table[key]
+            del values[key]
+        else:
+            table[key] = values[key] = random.random() * 20 - 10
+
+        if j % 100 == 99:
+            computed_outputs.append([table.get_max_value(), table.get_min_value(),
+                                     [table.get_start_state_max(state) for state in range(21)]])
+            desired_outputs.append([max(values.values()), min(values.values()),
+                                    [max([v for k, v in values.items() if k[0] == state], default=None)
+                                     for state in range(21)]])
+
+    print_test_results(computed_outputs, desired_outputs)
+
+
+def test_draw_rules():
+    """
+    Checks that two kings moving back and forth are drawn the third time the position appears.
+    """
+    board = Board()
+    board.empty_board()
+    board.insert_pieces([[3, 1, 3], [6, 2, 4]])
+    draw_rules = Draw_Rules(repetitions=3)
+    draw_rules.reset(board)
+
+    moves = [[[3, 1], [4, 1]], [[6, 2], [5, 2]], [[4, 1], [3, 1]], [[5, 2], [6, 2]]] * 2
+    computed_outputs = []
+    for move in moves:
+        board.make_move(move)
+        computed_outputs.append(draw_rules.update(board, move))
+
+    print_test_results(computed_outputs, [None] * 7 + [DRAWN_BY_RULE])
+
+
+class Final_Spots_Hook(Game_Hook):
+    """
+    A hook which remembers the board configuration each game ended in.
+    """
+
+    def __init__(self):
+        self.final_spots = []
+
+    def game_ended(self, game_board, outcome):
+        self.final_spots.append([row[:] for row in game_board.spots])
+
+
+def test_game_archive():
+    """
+    Checks that games recorded in a Game_Archive keep their outcomes, replay to the configurations
+    they ended in, and are the same after being exported to PDN and imported into another archive,
+    and that a standard PDN line imports as the moves it names.
+    """
+    random.seed(3)
+    random_player = Q_Learning_AI(False, 0, 0, the_random_move_probability=1)
+    random_player.set_training(False)
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = Game_Archive(os.path.join(directory, "games"))
+        final_spots_hook = Final_Spots_Hook()
+        outcomes = play_n_games(Alpha_beta(True, 1), random_player, 3, 200,
+                                [Game_Recording_Hook(archive), final_spots_hook])
+
+        archive.export_pdn(os.path.join(directory, "games.pdn"))
+        imported_archive = Game_Archive(os.path.join(directory, "imported"))
+        imported_archive.import_pdn(os.path.join(directory, "games.pdn"))
+
+        computed_outputs = [archive.get_outcomes().tolist()]
+        desired_outputs = [outcomes]
+        for j in range(len(outcomes)):
+            computed_outputs.append(archive.replay(j).spots)
+            desired_outputs.append(final_spots_hook.final_spots[j])
+            computed_outputs.append(imported_archive.get_game(j)[0])
+            desired_outputs.append(archive.get_game(j)[0])
+
+    # A standard opening line (11-15 23-19 8-11 22-17) is only legal with the standard numbering
+    standard_moves = read_pdn_games('[Event "Standard"]\n\n1. 11-15 23-19 2. 8-11 22-17 *\n')[0]
+    computed_outputs.append([standard_moves, [get_pdn_move(packed_move) for packed_move in standard_moves]])
+    desired_outputs.append([[bytes([9, 13]), bytes([21, 17]), bytes([4, 9]), bytes([22, 19])],
+                            ["11-15", "23-19", "8-11", "22-17"]])
+
+    print_test_results(computed_outputs, desired_outputs)
+
+
+def test_sprt_llr():
+    """
+    Checks the SPRT log-likelihood ratio of Tournament against known values for H0: elo 0 and
+    H1: elo 100 (or 10), e.g. 4 wins and nothing else gives 4*ln(0.64007/0.5).
+    """
+    test_inputs = [[4, 0, 0, 0, 100], [1, 0, 0, 0, 100], [0, 4, 0, 0, 100], [0, 0, 10, 0, 100], [30, 20, 50, 0, 10]]
+    desired_outputs = [0.98785, 0.24696, -1.31474, 0, 0.49319]
+    computed_outputs = [get_sprt_llr(*test_input) for test_input in test_inputs]
+    print_test_results(computed_outputs, desired_outputs, lambda a, b: abs(a - b) < 1e-4)
+
+
+def get_solved_endgame_ai(**kwargs):
+    """
+    Gets a Value_Iteration_AI (made with the given keyword arguments) which has solved a small
+    endgame against a depth 1 Alpha_beta.
+    """
+    board = Board()
+    board.empty_board()
+    board.insert_pieces([[3, 1, 1], [4, 1, 1], [6, 2, 2]])
+    player = Value_Iteration_AI(Alpha_beta(False, 1), board=board, **kwargs)
+    player.solve()
+    return player
+
+
+def get_policy_value_losses(player, values):
+    """
+    Gets how much worse (by the given values) the move of the player's policy is than the best
+    move, in every state with moves.
+    """
+    answer = []
+    for index, key in enumerate(player.states.keys[:len(player.graph)]):
+        if key in player.policy:
+            start, end = player.graph.action_offsets[index], player.graph.action_offsets[index + 1]
+            action_values = player.graph.calculate_action_values(values, start, end).tolist()
+            policy_action = [player.action_moves[j] for j in range(start, end)].index(player.policy[key])
+            answer.append(max(action_values) - action_values[policy_action])
+    return answer
+
+
+def test_prioritised_sweeping():
+    """
+    Checks that solving by prioritised sweeping gives values within theta of those of full sweeps,
+    and a policy whose moves are within theta of the best by those values.
+    """
+    serial_player = get_solved_endgame_ai()
+    priority_player = get_solved_endgame_ai(prioritised_sweeping=True)
+    serial_values = serial_player.states.get_values()[:len(serial_player.graph)]
+    priority_values = priority_player.states.get_values()[:len(priority_player.graph)]
+
+    computed_outputs = [serial_player.states.keys[:len(serial_player.graph)] ==
+                        priority_player.states.keys[:len(priority_player.graph)],
+                        float(abs(serial_values - priority_values).max()) < serial_player.theta,
+                        max(get_policy_value_losses(priority_player, serial_values)) < serial_player.theta]
+    print_test_results(computed_outputs, [True, True, True])
+
+
+def test_parallel_value_iteration():
+    """
+    Checks that value iteration split across two worker processes gives the same values and
+    policy as the serial solve.
+    """
+    serial_player = get_solved_endgame_ai()
+    parallel_player = get_solved_endgame_ai(num_workers=2)
+
+    computed_outputs = [parallel_player.states.get_values()[:len(parallel_player.graph)].tolist(),
+                        parallel_player.policy]
+    desired_outputs = [serial_player.states.get_values()[:len(serial_player.graph)].tolist(),
+                       serial_player.policy]
+    print_test_results(computed_outputs, desired_outputs)
+
+
 next_move_inputs = []
 next_move_inputs.append([[4,1,1],[4,2,1],[5,1,2]])
 next_move_inputs.append([[3,2,1],[5,2,1],[6,1,2]])
@@ -207,7 +444,28 @@ print("Possible next move tests:")
 test_possible_next_moves(next_move_inputs, next_move_outputs)
 print("")
 print("Alpha-beta Pruning tests:")
-test_alpha_beta_ai(alpha_beta_inputs, alpha_beta_outputs)    
-
-  
-
+test_alpha_beta_ai(alpha_beta_inputs, alpha_beta_outputs)
+print("")
+print("Batched simulator tests:")
+test_batched_simulator()
+print("")
+print("Canonical move tests:")
+test_canonical_moves()
+print("")
+print("Transition table tests:")
+test_transition_table()
+print("")
+print("Draw rule tests:")
+test_draw_rules()
+print("")
+print("Game archive tests:")
+test_game_archive()
+print("")
+print("SPRT tests:")
+test_sprt_llr()
+print("")
+print("Prioritised sweeping tests:")
+test_prioritised_sweeping()
+print("")
+print("Parallel value iteration tests:")
+test_parallel_value_iteration()
@@ -0,0 +1,145 @@
+"""
+Time controls for play_game/play_n_games, either a fixed number of seconds per move, or a base
+number of seconds per game for each player plus an increment after each of their moves.
+
+Before every move the player is told the deadline of the move (see Player.set_move_deadline),
+and after it the time taken is recorded for that player (1 or 2).  A move which takes longer
+than the player had left is an overrun, and is either flagged (counted, and the game goes on)
+or forfeited (the game ends as a win for the other player).
+
+NOTES:
+-Players are given a deadline DEADLINE_FRACTION of the way through the time they have left,
+so a player stopping its search at the deadline still has time to return its move.
+-Only some players can honour a deadline (Alpha_beta, and Value_Iteration_AI in RTDP mode).
+Others are timed all the same, and can overrun.
+-The recorded move times are kept across games (like Game_Hooks.Timing_Hook), so the latency
+percentiles cover every game played with the time control.
+"""
+
+import time
+
+import numpy as np
+
+DEADLINE_FRACTION = .9
+LATENCY_PERCENTILES = [50, 95, 99]
+
+
+def get_latency_percentiles(times):
+    """
+    Gets the percentiles of a list of move times in the form: [p50, p95, p99, max]
+    which are all 0 if there are no times.
+    """
+    if len(times) == 0:
+        return [0, 0, 0, 0]
+    return [float(value) for value in np.percentile(times, LATENCY_PERCENTILES)] + [max(times)]
+
+
+class Time_Control:
+    """
+    A class to keep each player's clock during games, and the time each of their moves took.
+    """
+
+    def __init__(self, move_time=None, base_time=None, increment=0, forfeit=False):
+        """
+        Initializes a time control of move_time seconds per move, or if that isn't given, base_time
+        seconds per game plus increment seconds after each move.  Overruns are forfeited if forfeit
+        is True, and only flagged otherwise.
+        """
+        if move_time is None and base_time is None:
+            raise ValueError("A time control needs a move_time or a base_time")
+        self.move_time = move_time
+        self.base_time = base_time
+        self.increment = increment
+        self.forfeit = forfeit
+
+        self.move_times = {1: [], 2: []}
+        self.overruns = {1: 0, 2: 0}
+        self.forfeits = {1: 0, 2: 0}
+        self.clocks = {1: base_time, 2: base_time}
+        self.current_player = None
+        self.move_start_time = 0
+
+    def reset(self):
+        """
+        Resets both players' clocks for the start of a game.
+        """
+        self.clocks = {1: self.base_time, 2: self.base_time}
+        self.current_player = None
+
+    def get_time_left(self, player_number):
+        """
+        Gets how many seconds the given player (1 or 2) has for its next move.
+        """
+        if self.move_time is not None:
+            return self.move_time
+        return max(self.clocks[player_number], 0)
+
+    def start_move(self, game_board, player):
+        """
+        Starts the clock of the player whose turn it is on the board, and gives it the move's deadline.
+        """
+        if game_board.player_turn:
+            self.current_player = 1
+        else:
+            self.current_player = 2
+        self.move_start_time = time.perf_counter()
+        player.set_move_deadline(self.move_start_time + DEADLINE_FRACTION * self.get_time_left(self.current_player))
+
+    def end_move(self, game_board, player):
+        """
+        Stops the clock of the player who just moved and records the move's time.  Returns the
+        game's outcome if the player forfeited by overrunning, and None otherwise.
+        """
+        move_time = time.perf_counter() - self.move_start_time
+        player.set_move_deadline(None)
+        self.move_times[self.current_player].append(move_time)
+
+        if self.move_time is not None:
+            overrun = move_time > self.move_time
+        else:
+            self.clocks[self.current_player] = self.clocks[self.current_player] - move_time
+            overrun = self.clocks[self.current_player] < 0
+            self.clocks[self.current_player] = self.clocks[self.current_player] + self.increment
+
+        if not overrun:
+            return None
+        self.overruns[self.current_player] = self.overruns[self.current_player] + 1
+        if not self.forfeit:
+            return None
+        self.forfeits[self.current_player] = self.forfeits[self.current_player] + 1
+        if self.current_player == 1:
+            return 1
+        return 0
+
+    def get_summary(self):
+        """
+        Gets the latency information of each player in the form:
+        {player: [num_moves, p50, p95, p99, max_move_time, num_overruns, num_forfeits]}
+        """
+        answer = {}
+        for player, times in self.move_times.items():
+            answer[player] = [len(times)] + get_latency_percentiles(times) + [self.overruns[player],
+                                                                            self.forfeits[player]]
+        return answer
+
+    def get_histogram(self, player_number, bins=20):
+        """
+        Gets a histogram of the given player's move times in the form returned by numpy.histogram:
+        [counts, bin_edges]
+        """
+        counts, bin_edges = np.histogram(self.move_times[player_number], bins=bins)
+        return [counts, bin_edges]
+
+    def print_summary(self):
+        """
+        Prints the latency information of each player.
+        """
+        for player, info in self.get_summary().items():
+            print("Player " + str(player) + ":")
+            print("Moves made: ".ljust(35), info[0])
+            print("p50 move time: ".ljust(35), info[1])
+            print("p95 move time: ".ljust(35), info[2])
+            print("p99 move time: ".ljust(35), info[3])
+            print("Max move time: ".ljust(35), info[4])
+            print("Overruns: ".ljust(35), info[5])
+            print("Forfeits: ".ljust(35), info[6])
@@ -0,0 +1,282 @@
+"""
+A round-robin tournament between any number of players, played across a pool of worker
+processes, with Elo ratings and optional SPRT early stopping of each pairing.
+
+Every entry of a tournament is in the form: [name, player1_config, player2_config]
+where player1_config is used to build it (see Player.build_player) when it goes first, and
+player2_config when it goes second, e.g.
+["alpha-beta 2", (Alpha_beta, (True, 2)), (Alpha_beta, (False, 2))]
+
+NOTES:
+-Each round, every pairing which hasn't been decided plays games_per_round games with each
+of its players going first, so colours are balanced (apart from one game when max_games is odd).
+-Wins count as 1 point, losses as 0, and any other outcome (ties, hitting the move limit,
+draws by rule) as a draw worth half a point.
+-A pairing's SPRT tests H0: the first player is elo0 stronger against H1: it is elo1 stronger,
+using the log-likelihood ratio of a trinomial (win, loss or draw) model of the results (see
+get_sprt_llr), and stops the pairing as soon as either is accepted.
+"""
+
+import math
+import itertools
+from multiprocessing import Pool
+
+import numpy as np
+
+from Match_Runner import play_match_games
+
+ELO_SCALE = 400 / math.log(10)
+# Caps the draw probability used by the SPRT at this fraction of the most it can be, so no win or loss probability is 0
+MAX_DRAW_FRACTION = .999
+
+
+def get_expected_score(elo_difference):
+    """
+    Gets the expected score (from 0 to 1) of a player the given amount of Elo stronger than its opponent.
+    """
+    return 1 / (1 + 10 ** (-elo_difference / 400))
+
+
+def get_elo_difference(score):
+    """
+    Gets the Elo difference matching an expected score, which is infinite for a score of 0 or 1.
+    """
+    if score <= 0:
+        return float("-inf")
+    if score >= 1:
+        return float("inf")
+    return -400 * math.log10(1 / score - 1)
+
+
+def get_elo_interval(wins, losses, draws, z=1.96):
+    """
+    Gets the Elo difference shown by a set of results, with the bounds of its confidence
+    interval (95% by default), in the form: [elo_difference, lower_bound, upper_bound]
+    """
+    num_games = wins + losses + draws
+    if num_games == 0:
+        return [0, float("-inf"), float("inf")]
+
+    score = (wins + draws / 2) / num_games
+    variance = (wins * (1 - score) ** 2 + losses * score ** 2 + draws * (0.5 - score) ** 2) / num_games
+    margin = z * math.sqrt(variance / num_games)
+    return [get_elo_difference(score), get_elo_difference(score - margin), get_elo_difference(score + margin)]
+
+
+def get_trinomial_probabilities(score, draw_probability):
+    """
+    Gets the probabilities of a win, loss and draw in the form: [win, loss, draw]
+    for a player with the given expected score and probability of drawing.
+    """
+    return [score - draw_probability / 2, 1 - score - draw_probability / 2, draw_probability]
+
+
+def get_sprt_llr(wins, losses, draws, elo0, elo1):
+    """
+    Gets the log-likelihood ratio of H1: the elo difference is elo1, over H0: it is elo0,
+    given a set of results.
+
+    NOTES:
+    -Results are modelled as trinomial (win, loss or draw), with the draw probability set to
+    its maximum likelihood estimate (the fraction of games drawn), so only the expected score
+    differs between the hypotheses.
+    """
+    num_games = wins + losses + draws
+    if num_games == 0:
+        return 0
+
+    score0 = get_expected_score(elo0)
+    score1 = get_expected_score(elo1)
+    # Keeps every win and loss probability above 0 when (nearly) every game was drawn
+    draw_probability = min(draws / num_games, MAX_DRAW_FRACTION * 2 * min(score0, 1 - score0, score1, 1 - score1))
+
+    probabilities0 = get_trinomial_probabilities(score0, draw_probability)
+    probabilities1 = get_trinomial_probabilities(score1, draw_probability)
+    answer = 0
+    for count, probability0, probability1 in zip([wins, losses], probabilities0, probabilities1):
+        if count != 0:
+            answer = answer + count * math.log(probability1 / probability0)
+    return answer
+
+
+def fit_ratings(points, num_games, num_iterations=1000, tolerance=1e-9):
+    """
+    Gets the Elo rating (averaging 0) of each player which best fits the results, along with its
+    standard error, in the form: [ratings, standard_errors]
+    points[i, j] is the points player i scored against player j in num_games[i, j] games.
+
+    NOTES:
+    -The ratings are the maximum likelihood Bradley-Terry strengths, found with the MM algorithm.
+    Players who won or lost every game get a rating which is only as far out as the iteration got.
+    """
+    num_players = len(points)
+    strengths = np.ones(num_players)
+    total_points = np.maximum(np.sum(points, axis=1), 1e-3)
+    for _ in range(num_iterations):
+        denominators = np.sum(num_games / (strengths[:, None] + strengths[None, :]), axis=1)
+        new_strengths = total_points / np.maximum(denominators, 1e-12)
+        new_strengths = new_strengths / np.exp(np.mean(np.log(new_strengths)))
+        if np.max(np.abs(new_strengths - strengths)) < tolerance:
+            strengths = new_strengths
+            break
+        strengths = new_strengths
+
+    expected = strengths[:, None] / (strengths[:, None] + strengths[None, :])
+    information = np.sum(num_games * expected * (1 - expected), axis=1)
+    standard_errors = ELO_SCALE / np.sqrt(np.maximum(information, 1e-12))
+
+    ratings = ELO_SCALE * np.log(strengths)
+    return [ratings - np.mean(ratings), standard_errors]
+
+
+class Tournament:
+    """
+    A class to play and keep the results of a round-robin tournament.
+    """
+
+    def __init__(self, entries, move_limit, games_per_round=2, max_games=100, num_workers=4, seed=None,
+                 sprt=None, draw_rules=None):
+        """
+        Initializes a tournament between the given entries (see the module's notes).  Each pairing
+        plays at most max_games games.
+
+        sprt is either None (every pairing plays max_games games) or in the form:
+        [elo0, elo1, alpha, beta]
+        with alpha and beta being the chances of wrongly accepting H1 and H0 respectively.
+        Games are ended early with draw_rules (a Draw_Rules) if given.
+        """
+        self.entries = entries
+        self.move_limit = move_limit
+        self.games_per_round = games_per_round
+        self.max_games = max_games
+        self.num_workers = num_workers
+        self.seed = seed
+        self.sprt = sprt
+        self.draw_rules = draw_rules
+
+        self.pairings = list(itertools.combinations(range(len(entries)), 2))
+        # results[(i, j)] is [wins of i, wins of j, draws]
+        self.results = {pairing: [0, 0, 0] for pairing in self.pairings}
+        self.decisions = {pairing: None for pairing in self.pairings}
+        self.round_number = 0
+
+    def get_num_games(self, pairing):
+        return sum(self.results[pairing])
+
+    def is_finished(self, pairing):
+        return self.decisions[pairing] is not None or self.get_num_games(pairing) >= self.max_games
+
+    def get_round_tasks(self):
+        """
+        Gets the tasks (for Match_Runner.play_match_games) of the next round, in the form:
+        [tasks, task_pairings]
+        where task_pairings[k] is [pairing, first_player_index] for tasks[k].
+        """
+        tasks = []
+        task_pairings = []
+        for pairing in self.pairings:
+            if self.is_finished(pairing):
+                continue
+            # Split the games left between the colours, so the pairing never goes past max_games
+            games_left = self.max_games - self.get_num_games(pairing)
+            first_colour_games = min(self.games_per_round, (games_left + 1) // 2)
+            second_colour_games = min(self.games_per_round, games_left - first_colour_games)
+            for (first, second), num_games in zip([pairing, pairing[::-1]], [first_colour_games, second_colour_games]):
+                if num_games == 0:
+                    continue
+                if self.seed is None:
+                    seed = None
+                else:
+                    seed = str(self.seed) + ":" + str(first) + ":" + str(second)
+                tasks.append([self.entries[first][1], self.entries[second][2], self.round_number * self.games_per_round,
+                              num_games, self.move_limit, seed, self.draw_rules])
+                task_pairings.append([pairing, first])
+
+        return [tasks, task_pairings]
+
+    def add_outcomes(self, pairing, first_player, outcomes):
+        """
+        Adds the outcomes (in the format returned by play_n_games) of games in a pairing where
+        first_player went first.
+        """
+        for outcome in outcomes:
+            if outcome[0] == 0:
+                winner = first_player
+            elif outcome[0] == 1:
+                winner = pairing[0] + pairing[1] - first_player
+            else:
+                winner = None
+
+            if winner is None:
+                self.results[pairing][2] = self.results[pairing][2] + 1
+            elif winner == pairing[0]:
+                self.results[pairing][0] = self.results[pairing][0] + 1
+            else:
+                self.results[pairing][1] = self.results[pairing][1] + 1
+
+    def update_decision(self, pairing):
+        """
+        Decides a pairing if its SPRT has accepted either hypothesis.
+        """
+        if self.sprt is None:
+            return
+        elo0, elo1, alpha, beta = self.sprt
+        llr = get_sprt_llr(self.results[pairing][0], self.results[pairing][1], self.results[pairing][2], elo0, elo1)
+        if llr >= math.log((1 - beta) / alpha):
+            self.decisions[pairing] = "H1"
+        elif llr <= math.log(beta / (1 - alpha)):
+            self.decisions[pairing] = "H0"
+
+    def play(self):
+        """
+        Plays rounds until every pairing has been decided or played max_games games.
+        """
+        with Pool(self.num_workers) as pool:
+            while True:
+                tasks, task_pairings = self.get_round_tasks()
+                if len(tasks) == 0:
+                    break
+
+                for outcomes, (pairing, first_player) in zip(pool.map(play_match_games, tasks), task_pairings):
+                    self.add_outcomes(pairing, first_player, outcomes)
+                for pairing in self.pairings:
+                    if self.decisions[pairing] is None:
+                        self.update_decision(pairing)
+
+                self.round_number = self.round_number + 1
+
+    def get_pairing_elo(self, pairing):
+        """
+        Gets how much stronger the first player of a pairing is than the second, in the form
+        returned by get_elo_interval.
+        """
+        return get_elo_interval(*self.results[pairing])
+
+    def get_ratings(self, z=1.96):
+        """
+        Gets the rating of each entry, fitted to every game played, in the form:
+        [[name, rating, lower_bound, upper_bound], ...]
+        """
+        num_players = len(self.entries)
+        points = np.zeros((num_players, num_players))
+        num_games = np.zeros((num_players, num_players))
+        for (i, j), (wins_i, wins_j, draws) in self.results.items():
+            points[i, j] = wins_i + draws / 2
+            points[j, i] = wins_j + draws / 2
+            num_games[i, j] = num_games[j, i] = wins_i + wins_j + draws
+
+        ratings, standard_errors = fit_ratings(points, num_games)
+        return [[self.entries[j][0], ratings[j], ratings[j] - z * standard_errors[j], ratings[j] + z * standard_errors[j]]
+                for j in range(num_players)]
+
+    def print_standings(self):
+        """
+        Prints the rating of each entry and the results of each pairing.
+        """
+        for name, rating, lower_bound, upper_bound in sorted(self.get_ratings(), key=lambda info: -info[1]):
+            print(str(name).ljust(35), "%.1f (%.1f to %.1f)" % (rating, lower_bound, upper_bound))
+        print("")
+        for pairing in self.pairings:
+            wins_i, wins_j, draws = self.results[pairing]
+            print((str(self.entries[pairing[0]][0]) + " vs " + str(self.entries[pairing[1]][0])).ljust(35),
+                  "+" + str(wins_i), "-" + str(wins_j), "=" + str(draws), self.decisions[pairing] or "")
@@ -0,0 +1,83 @@
+"""
+The explicit dynamics of a set of states, stored as CSR style NumPy arrays, so that
+Bellman backups can be done as array operations.
+"""
+
+import numpy as np
+
+
+class Transition_Graph:
+    """
+    A class to hold the transitions between a set of states with dense indices:
+    -the actions of state i are action_offsets[i] to action_offsets[i + 1]
+    -the outcomes of action a are successor_offsets[a] to successor_offsets[a + 1], indexing
+    successors (the state indices), probabilities and rewards
+    -terminal_states[i] is True if state i has no actions, in which case its value is terminal_value
+    """
+
+    def __init__(self, action_offsets, successor_offsets, successors, probabilities, rewards, terminal_states,
+                 discount_factor, terminal_value):
+        self.action_offsets = np.asarray(action_offsets, dtype=np.int64)
+        self.successor_offsets = np.asarray(successor_offsets, dtype=np.int64)
+        self.successors = np.asarray(successors, dtype=np.int64)
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+        self.rewards = np.asarray(rewards, dtype=np.float64)
+        self.terminal_states = np.asarray(terminal_states, dtype=np.bool_)
+        self.discount_factor = discount_factor
+        self.terminal_value = terminal_value
+        self.predecessor_offsets = None
+        self.predecessors = None
+
+    def __len__(self):
+        return len(self.terminal_states)
+
+    def calculate_action_values(self, values, first_action=0, last_action=None):
+        """
+        Gets the expected values of the actions first_action to last_action (all of them by
+        default), given the values of the states.
+        """
+        if last_action is None:
+            last_action = len(self.successor_offsets) - 1
+        if first_action == last_action:
+            return np.zeros(0)
+
+        first = self.successor_offsets[first_action]
+        last = self.successor_offsets[last_action]
+        outcome_values = self.probabilities[first:last] * (self.rewards[first:last] + self.discount_factor * values[self.successors[first:last]])
+
+        return np.add.reduceat(outcome_values, self.successor_offsets[first_action:last_action] - first)
+
+    def backup_states(self, values, first_state=0, last_state=None):
+        """
+        Gets the result of a Bellman backup of the states first_state to last_state (all of
+        them by default) at once, given the current values of every state.
+        """
+        if last_state is None:
+            last_state = len(self)
+        new_values = np.full(last_state - first_state, self.terminal_value, dtype=np.float64)
+
+        has_actions = np.logical_not(self.terminal_states[first_state:last_state])
+        if np.any(has_actions):
+            first_action = self.action_offsets[first_state]
+            action_values = self.calculate_action_values(values, first_action, self.action_offsets[last_state])
+            new_values[has_actions] = np.maximum.reduceat(action_values, self.action_offsets[first_state:last_state][has_actions] - first_action)
+
+        return new_values
+
+    def get_predecessors(self):
+        """
+        Gets the reverse edges of the graph in CSR style form: [predecessor_offsets, predecessors]
+        where the distinct states with an action which can lead to state i are
+        predecessors[predecessor_offsets[i]:predecessor_offsets[i + 1]] .
+        These are only computed the first time they're asked for.
+        """
+        if self.predecessors is None:
+            num_states = len(self)
+            state_of_action = np.repeat(np.arange(num_states), np.diff(self.action_offsets))
+            sources = state_of_action[np.repeat(np.arange(len(self.successor_offsets) - 1), np.diff(self.successor_offsets))]
+
+            edges = np.unique(self.successors * num_states + sources)
+            self.predecessors = edges % num_states
+            self.predecessor_offsets = np.searchsorted(edges // num_states, np.arange(num_states + 1))
+
+        return [self.predecessor_offsets, self.predecessors]
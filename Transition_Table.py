@@ -0,0 +1,153 @@
+"""
+A dictionary of transition values which keeps statistics about its values up to date
+as it is written to.
+"""
+
+import heapq
+import math
+
+
+class Transition_Table(dict):
+    """
+    A dictionary mapping transitions (start_state, end_state) to their values, which
+    maintains the sum of the values, the values of the transitions from each start state,
+    a histogram of the values and the maximum/minimum value as it is changed.
+
+    NOTES:
+    -The maximum and minimum are kept in heaps which are cleaned lazily, so that a value
+    decreasing (or increasing) is handled correctly.  Stale heap entries are skipped when
+    read, and the heaps are rebuilt when they have grown much larger than the table.
+    -The values are also kept grouped by start state, so the best transition out of a state
+    is found without looking at any other state's transitions.
+    """
+
+    def __init__(self, transitions=None, histogram_bin_width=1):
+        """
+        Initializes the table with the given transitions (if any).  Values in the histogram
+        are grouped into bins of width histogram_bin_width.
+        """
+        dict.__init__(self)
+        self.histogram_bin_width = histogram_bin_width
+        self.total_value = 0
+        self.start_state_values = {}
+        self.histogram = {}
+        self.max_heap = []
+        self.min_heap = []
+        if transitions is not None:
+            self.update(transitions)
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), self.histogram_bin_width)
+
+    def get_bin(self, value):
+        """
+        Gets the index of the histogram bin the given value falls in.
+        """
+        return math.floor(value / self.histogram_bin_width)
+
+    def remove_value(self, value):
+        self.total_value = self.total_value - value
+        value_bin = self.get_bin(value)
+        if self.histogram[value_bin] == 1:
+            del self.histogram[value_bin]
+        else:
+            self.histogram[value_bin] = self.histogram[value_bin] - 1
+
+    def add_value(self, key, value):
+        self.total_value = self.total_value + value
+        value_bin = self.get_bin(value)
+        self.histogram[value_bin] = self.histogram.get(value_bin, 0) + 1
+
+        heapq.heappush(self.max_heap, (-value, key))
+        heapq.heappush(self.min_heap, (value, key))
+        if len(self.max_heap) > 2 * len(self) + 64:
+            self.max_heap = [(-v, k) for k, v in self.items()]
+            self.min_heap = [(v, k) for k, v in self.items()]
+            heapq.heapify(self.max_heap)
+            heapq.heapify(self.min_heap)
+
+    def __setitem__(self, key, value):
+        if key in self:
+            self.remove_value(dict.__getitem__(self, key))
+            self.start_state_values[key[0]][key[1]] = value
+        elif key[0] in self.start_state_values:
+            self.start_state_values[key[0]][key[1]] = value
+        else:
+            self.start_state_values[key[0]] = {key[1]: value}
+
+        dict.__setitem__(self, key, value)
+        self.add_value(key, value)
+
+    def __delitem__(self, key):
+        self.remove_value(dict.__getitem__(self, key))
+        if len(self.start_state_values[key[0]]) == 1:
+            del self.start_state_values[key[0]]
+        else:
+            del self.start_state_values[key[0]][key[1]]
+
+        dict.__delitem__(self, key)
+
+    def update(self, other=(), **kwargs):
+        if hasattr(other, "items"):
+            other = other.items()
+        for key, value in other:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        value = dict.__getitem__(self, key)
+        del self[key]
+        return value
+
+    def clear(self):
+        dict.clear(self)
+        self.total_value = 0
+        self.start_state_values = {}
+        self.histogram = {}
+        self.max_heap = []
+        self.min_heap = []
+
+    def get_start_state_max(self, start_state):
+        """
+        Gets the largest value of the transitions from the given start state, or None if there are none.
+        """
+        values = self.start_state_values.get(start_state)
+        if values is None:
+            return None
+        return max(values.values())
+
+    def get_max_value(self):
+        """
+        Gets the largest value in the table, or None if it's empty.
+        """
+        while self.max_heap and dict.get(self, self.max_heap[0][1]) != -self.max_heap[0][0]:
+            heapq.heappop(self.max_heap)
+        if not self.max_heap:
+            return None
+        return -self.max_heap[0][0]
+
+    def get_min_value(self):
+        """
+        Gets the smallest value in the table, or None if it's empty.
+        """
+        while self.min_heap and dict.get(self, self.min_heap[0][1]) != self.min_heap[0][0]:
+            heapq.heappop(self.min_heap)
+        if not self.min_heap:
+            return None
+        return self.min_heap[0][0]
+
+    def get_histogram(self):
+        """
+        Gets the histogram of the values in the table in the form:
+        [[bin1_start, count1], [bin2_start, count2], ...]
+        sorted by bin, with empty bins left out.
+        """
+        return [[value_bin * self.histogram_bin_width, self.histogram[value_bin]] for value_bin in sorted(self.histogram)]
@@ -1,30 +1,109 @@
+import os
+import copy
+import struct
+import zlib
+import time
+import random
+import heapq
+import hashlib
+import threading
 from Player import Player
 from Board import Board
+from State_Store import State_Store
+from Opponent_Model import Opponent_Model
+from Transition_Graph import Transition_Graph
+from Parallel_Value_Iteration import solve_in_parallel
 import numpy as np
-import IPython.core.debugger
-dbg = IPython.core.debugger.Pdb()
+
+POLICY_FILE_HEADER = b"CKPL"
+
+
+def save_policy(policy, file_name):
+    """
+    Saves a policy (a dictionary mapping position keys to packed moves) to a compact binary file:
+    the header, the number of entries, then zlib compressed entries of [key, move length, move].
+    """
+    entries = b"".join(key + bytes([len(packed_move)]) + packed_move for key, packed_move in policy.items())
+    with open(file_name, 'wb') as fp:
+        fp.write(POLICY_FILE_HEADER + struct.pack("<I", len(policy)) + zlib.compress(entries))
+
+
+def load_policy(file_name, key_length=33):
+    """
+    Loads a policy saved by save_policy, as a dictionary mapping position keys to packed moves.
+    """
+    with open(file_name, 'rb') as fp:
+        data = fp.read()
+    if data[:len(POLICY_FILE_HEADER)] != POLICY_FILE_HEADER:
+        raise ValueError(file_name + " is not a policy file")
+
+    num_entries = struct.unpack("<I", data[4:8])[0]
+    entries = zlib.decompress(data[8:])
+    policy = {}
+    position = 0
+    for _ in range(num_entries):
+        key = entries[position:position + key_length]
+        move_length = entries[position + key_length]
+        policy[key] = entries[position + key_length + 1:position + key_length + 1 + move_length]
+        position = position + key_length + 1 + move_length
+
+    return policy
 
 
 class Value_Iteration_AI(Player):
+    """
+    NOTES:
+    -Nothing is solved when the AI is created.  The value iteration is run the first time a move
+    is asked for (or in a background thread, see start_background_solve), from the configuration
+    the board was in when the AI was created.
+    -If given a cache_directory, the solved values, transition graph and policy are saved there
+    under a key made from the opponent's configuration (including a digest of what it has learned,
+    see Player.get_learned_data_digest), the discount factor, theta and the starting configuration,
+    and later AI with the same key load them instead of solving again.
+    -The policy maps the key (Board.get_position_key) of each solved state to its best move
+    (packed with Board.pack_move), so a move is found with one dictionary lookup.  It can be
+    exported with export_policy and loaded without solving with load_policy.  Since the AI is
+    player 1, these keys are also the canonical keys of the states (see Board.get_canonical_key).
+    -Solving uses its own board and a copy of the opponent, so it doesn't disturb a game in progress.
+    -In RTDP mode nothing is solved up front.  Instead, every get_next_move runs simulated trials
+    from the current configuration (within a budget of trials and/or time), only backing up the
+    states the trials visit.  Values and the expanded states are kept between moves.
+    """
     LOSING_STATES = -100
     WINNING_STATES = 100
 
-    def __init__(self, opponent, player_id=1, discount_factor=0.5, board=None):
+    def __init__(self, opponent, player_id=1, discount_factor=0.5, board=None, opponent_cache_file=None,
+                 num_workers=1, prioritised_sweeping=False, theta=0.0001, cache_directory=None, rtdp=False,
+                 rtdp_trials=100, rtdp_time=None, rtdp_max_trial_length=200):
         self.player_id = player_id
         self.discount_factor = discount_factor
-        self.states = []
-        self.value_function = []
-        self.policy = []
+        self.theta = theta
+        self.num_workers = num_workers          # number of processes the value iteration sweeps are split across
+        self.prioritised_sweeping = prioritised_sweeping    # use solve_by_priority instead of full sweeps
+        self.cache_directory = cache_directory
+        self.rtdp = rtdp                                    # plan with real-time dynamic programming at each move
+        self.rtdp_trials = rtdp_trials                      # most trials per move (None for no limit)
+        self.rtdp_time = rtdp_time                          # most seconds of trials per move (None for no limit)
+        self.rtdp_max_trial_length = rtdp_max_trial_length
+        self.expansions = {}
+        self.opponent_model = None
+        self.opponent_cache_file = opponent_cache_file
+        self.states = State_Store()
+        self.policy = None
+        self.graph = None
         self.opponent = opponent
         self.board = board
 
         if self.board is None:
             self.board = Board()
-
-        self.value_iteration()
+        self.start_spots = copy.deepcopy(self.board.spots)
+        self.solver_board = Board(old_spots=copy.deepcopy(self.start_spots))
+        self.solved = False
+        self.solve_lock = threading.Lock()
+        self.solve_thread = None
 
     def reward_function(self, state_info1, state_info2):
-        if self.board.is_game_over():
+        if self.solver_board.is_game_over():
             if state_info2[1] == 0 and state_info2[3] == 0:    # winning state
                 return 100
             elif state_info2[0] == 0 and state_info2[2] == 0:  # losing state
@@ -40,8 +119,8 @@ class Value_Iteration_AI(Player):
             return gained_reward - lost_reward
 
     def get_reward(self, current_spots, next_spots):
-        current_status = self.board.get_states_from_boards_spots([current_spots])
-        next_status = self.board.get_states_from_boards_spots([next_spots])
+        current_status = self.solver_board.get_states_from_boards_spots([current_spots])
+        next_status = self.solver_board.get_states_from_boards_spots([next_spots])
 
         return self.reward_function(current_status[0], next_status[0])
 
@@ -49,83 +128,353 @@ class Value_Iteration_AI(Player):
         # the probability of taking the action is calculated by 1 / (number of actions x number of opponent actions)
         return 1 / (len(actions) * len(opponent_action))
 
+    def get_state_key(self, state):
+        return self.solver_board.get_position_key(state, True)
+
+    def get_state_spots(self, index):
+        return self.solver_board.get_spots_from_position_key(self.states.keys[index])[0]
+
     def get_value(self, state):
-        try:    # if the state has already observed, find state's index and state's value and return them
-            index = self.states.index(state)
+        # if the state has not been observed yet, the store creates it with a value of 0
+        index = self.states.add(self.get_state_key(state))[0]
 
-            return self.value_function[index], index
-        except ValueError:      # if the state has not been observed yet, create a new state and add it to states array
-            self.states.append(state)
-            self.value_function.append(0)
-            index = len(self.value_function) - 1
+        return self.states.values[index], index
 
-            return 0, index
+    def get_action_outcomes(self, state, move, possible_moves):
+        """
+        Gets the possible results of making the given move in the given state, followed by the
+        opponent's reply, in the form:
+        [[next_state, probability, reward], ...]
+        """
+        self.solver_board.set_spots(state)                                 # recover board to state condition
+        self.solver_board.player_turn = True
+        self.solver_board.make_move(move)                                  # make my move
 
-    def calculate_value_of_action(self, state, possible_moves, opponent_moves):
-        next_state = self.board.spots                     # determine next state
-        next_state_value = self.get_value(next_state)[0]  # obtain value of next state. If the state is not in the states array, this function creates the state and adds to the array
-        reward = self.get_reward(state, next_state)
-        prob = self.get_transition_probabilities(possible_moves, opponent_moves)
+        if self.solver_board.is_game_over():                               # the opponent can't reply
+            next_state = self.solver_board.spots
+            outcome = [[next_state, self.get_transition_probabilities(possible_moves, [None]), self.get_reward(state, next_state)]]
+            self.solver_board.switch_turn()
 
-        return prob * (reward + self.discount_factor * next_state_value)
+            return outcome
 
-    def calculate_expected_value(self, state):
-        if self.board.is_game_over():
-            return [self.LOSING_STATES]
+        after_move_state = copy.deepcopy(self.solver_board.spots)          # the opponent may swap out the board's spots
+        opponent_replies = self.opponent_model.get_replies(self.solver_board)  # determine possible opponent's moves
+
+        outcomes = []
+        for opp_move, reply_probability in opponent_replies:        # a stochastic opponent can have more than one reply
+            self.solver_board.set_spots(after_move_state)
+            self.solver_board.player_turn = False
+            self.solver_board.make_move(opp_move)                          # make opponent move to obtain next state
+
+            next_state = self.solver_board.spots
+            probability = self.get_transition_probabilities(possible_moves, [None]) * reply_probability
+            outcomes.append([next_state, probability, self.get_reward(state, next_state)])
+
+        return outcomes
+
+    def build_transition_graph(self):
+        """
+        Phase one of value iteration.  Expands every state reachable from the starting
+        configuration once, and stores the dynamics in self.graph (a Transition_Graph).
+        """
+        action_offsets = [0]
+        action_moves = []
+        successor_offsets = [0]
+        successors = []
+        probabilities = []
+        rewards = []
+        terminal_states = []
+
+        self.get_value(self.start_spots)
+
+        index = 0
+        while index < len(self.states):  # states discovered while expanding are expanded as well
+            state = self.get_state_spots(index)
+            self.solver_board.set_spots(state)
+            self.solver_board.player_turn = True
+
+            possible_moves = self.solver_board.get_possible_next_moves()
+            terminal_states.append(len(possible_moves) == 0)
+
+            for move in possible_moves:
+                action_moves.append(self.solver_board.pack_move(move))
+                for next_state, probability, reward in self.get_action_outcomes(state, move, possible_moves):
+                    successors.append(self.get_value(next_state)[1])
+                    probabilities.append(probability)
+                    rewards.append(reward)
+                successor_offsets.append(len(successors))
+
+            action_offsets.append(len(successor_offsets) - 1)
+            index += 1
+
+        self.action_moves = action_moves        # the packed move of each action of the graph
+        self.graph = Transition_Graph(action_offsets, successor_offsets, successors, probabilities, rewards,
+                                      terminal_states, self.discount_factor, self.LOSING_STATES)
+
+    def solve_transition_graph(self, theta=0.0001):
+        """
+        Phase two of value iteration.  Repeats Bellman backups of all the states in the transition
+        graph until no value changes by theta or more.
+        """
+        values = self.states.get_values().copy()
 
-        possible_moves = self.board.get_possible_next_moves()
-        expected_value = np.zeros(len(possible_moves))
+        while True:
+            new_values = self.graph.backup_states(values)
+            delta = np.max(np.abs(new_values - values))
+            values = new_values
 
-        for i in range(len(possible_moves)):
-            move = possible_moves[i]
-            self.board.set_spots(state)                             # recover board to state condition
+            if delta < theta:
+                break
 
-            self.board.make_move(move)                              # make my move
-            opponent_moves = [self.opponent.get_next_move()]  # determine possible opponent's moves
+        self.states.get_values()[:] = values
 
-            if self.board.is_game_over():
-                expected_value[i] = self.calculate_value_of_action(state, possible_moves, opponent_moves)
-                self.board.switch_turn()
+    def solve_by_priority(self, theta=0.0001):
+        """
+        An alternative to solve_transition_graph which uses prioritised sweeping.  States are
+        backed up one at a time and in place, highest Bellman error first.  When a state's value
+        changes, each state which can lead to it has its Bellman error recomputed and is queued
+        if that's the threshold or more.  Stops once no state has a Bellman error of the threshold
+        or more.
+
+        NOTES:
+        -The threshold is theta * (1 - discount_factor), since values with Bellman errors below
+        that are within theta of their exact values (like those of solve_transition_graph).
+        """
+        threshold = theta * (1 - self.discount_factor)
+        values = self.states.get_values()[:len(self.graph)].copy()
+        predecessor_offsets, predecessors = self.graph.get_predecessors()
 
+        errors = np.abs(self.graph.backup_states(values) - values)
+        queue = [(-errors[index], index) for index in np.flatnonzero(errors >= threshold).tolist()]
+        heapq.heapify(queue)
+
+        self.num_backups = 0
+        while queue:
+            index = heapq.heappop(queue)[1]
+
+            new_value = self.graph.backup_states(values, index, index + 1)[0]
+            if abs(new_value - values[index]) < threshold:          # already backed up since it was queued
                 continue
+            values[index] = new_value
+            self.num_backups += 1
+
+            for predecessor in predecessors[predecessor_offsets[index]:predecessor_offsets[index + 1]].tolist():
+                error = abs(self.graph.backup_states(values, predecessor, predecessor + 1)[0] - values[predecessor])
+                if error >= threshold:
+                    heapq.heappush(queue, (-error, predecessor))
 
-            for opp_move in opponent_moves:                         # maybe there can be more than one opponent moves
-                self.board.make_move(opp_move)                      # make opponent move to obtain next state
-                expected_value[i] += self.calculate_value_of_action(state, possible_moves, opponent_moves)
+        self.states.get_values()[:] = values
 
-        return expected_value
+    def calculate_expected_value(self, state):
+        index = self.states.find(self.get_state_key(state))
+        if self.graph.terminal_states[index]:
+            return [self.LOSING_STATES]
+
+        return self.graph.calculate_action_values(self.states.get_values(), self.graph.action_offsets[index],
+                                                  self.graph.action_offsets[index + 1])
+
+    def prepare_solver(self):
+        solver_opponent = copy.deepcopy(self.opponent)
+        solver_opponent.set_board(self.solver_board)
+        self.opponent_model = Opponent_Model(solver_opponent, self.opponent_cache_file)   # remembers the opponent's replies
 
     def value_iteration(self, theta=0.0001):
-        self.states.append(self.board.spots)
-        self.value_function.append(0)
+        self.solver_board.set_spots(self.start_spots)
+        self.prepare_solver()
 
-        while True:
-            delta = 0
+        self.build_transition_graph()
+        if self.opponent_model.cache_file is not None:
+            self.opponent_model.save_replies()
+
+        if self.prioritised_sweeping:
+            self.solve_by_priority(theta)
+        elif self.num_workers > 1:
+            self.states.get_values()[:] = solve_in_parallel(self.graph, self.states.get_values(), theta, self.num_workers)
+        else:
+            self.solve_transition_graph(theta)
 
-            for state in self.states:
-                self.board.set_spots(state)  # make the board look like same as the state
+        self.calculate_policy()
 
-                v, index = self.get_value(state)
+    def calculate_policy(self):
+        """
+        Sets self.policy to a dictionary mapping the key of each state with actions to its best
+        action, packed with Board.pack_move .
+        """
+        self.policy = {}
 
-                expected_value = self.calculate_expected_value(state)
+        has_actions = np.logical_not(self.graph.terminal_states)
+        if np.any(has_actions):
+            action_values = self.graph.calculate_action_values(self.states.get_values())     # get values of actions
+            action_starts = self.graph.action_offsets[:-1][has_actions]
+            action_counts = np.diff(self.graph.action_offsets)[has_actions]
 
-                self.value_function[index] = np.max(expected_value)
+            best_values = np.repeat(np.maximum.reduceat(action_values, action_starts), action_counts)
+            action_indices = np.where(action_values == best_values, np.arange(len(action_values)), len(action_values))
+            best_actions = np.minimum.reduceat(action_indices, action_starts)      # first best action of each state
 
-                delta = max(delta, np.abs(v - self.value_function[index]))
+            for index, best_action in zip(np.flatnonzero(has_actions).tolist(), best_actions.tolist()):
+                self.policy[self.states.keys[index]] = self.action_moves[best_action]
 
-            if delta < theta:
+    def get_solution_key(self):
+        """
+        Gets a key identifying what the AI solves for: the opponent's description (see
+        Player.get_description), the discount factor, theta and the starting configuration.
+        """
+        description = repr([self.opponent.get_description(), self.discount_factor, self.theta,
+                            self.solver_board.get_position_key(self.start_spots, True).hex()])
+        return hashlib.sha1(description.encode()).hexdigest()
+
+    def get_solution_file(self):
+        return os.path.join(self.cache_directory, "value_iteration_" + self.get_solution_key())
+
+    def save_solution(self, file_name):
+        """
+        Saves the states, their values and the transition graph to file_name + ".npz", and the
+        policy to file_name + ".policy".
+        """
+        keys = np.frombuffer(b"".join(self.states.keys), dtype=np.uint8).reshape(len(self.states), -1)
+        np.savez(file_name + ".npz", keys=keys, values=self.states.get_values(),
+                 action_offsets=self.graph.action_offsets, successor_offsets=self.graph.successor_offsets,
+                 successors=self.graph.successors, probabilities=self.graph.probabilities,
+                 rewards=self.graph.rewards, terminal_states=self.graph.terminal_states,
+                 action_move_lengths=np.array([len(move) for move in self.action_moves], dtype=np.uint8),
+                 action_move_squares=np.frombuffer(b"".join(self.action_moves), dtype=np.uint8))
+        self.export_policy(file_name + ".policy")
+
+    def load_solution(self, file_name):
+        """
+        Loads the states, their values and the policy saved by save_solution.
+        """
+        with np.load(file_name + ".npz") as data:
+            self.states = State_Store(max(len(data["keys"]), 1))
+            for key in data["keys"]:
+                self.states.add(key.tobytes())
+            self.states.get_values()[:] = data["values"]
+
+            self.graph = Transition_Graph(data["action_offsets"], data["successor_offsets"], data["successors"],
+                                          data["probabilities"], data["rewards"], data["terminal_states"],
+                                          self.discount_factor, self.LOSING_STATES)
+            move_ends = np.cumsum(data["action_move_lengths"].astype(np.int64)).tolist()
+            squares = data["action_move_squares"].tobytes()
+            self.action_moves = [squares[end - length:end]
+                                 for end, length in zip(move_ends, data["action_move_lengths"].tolist())]
+        self.policy = load_policy(file_name + ".policy")
+
+    def export_policy(self, file_name):
+        """
+        Saves the policy to a compact binary file, which can be loaded with load_policy.
+        """
+        save_policy(self.policy, file_name)
+
+    def solve(self):
+        """
+        Makes sure the values and policy are available, by loading them from the cache directory
+        if they were saved there before, and running value iteration otherwise.  Does nothing
+        if already solved, and waits for a solve running in another thread.
+        """
+        with self.solve_lock:
+            if self.solved:
+                return
+
+            if self.cache_directory is not None and os.path.exists(self.get_solution_file() + ".policy"):
+                self.load_solution(self.get_solution_file())
+            else:
+                self.value_iteration(self.theta)
+                if self.cache_directory is not None:
+                    os.makedirs(self.cache_directory, exist_ok=True)
+                    self.save_solution(self.get_solution_file())
+
+            self.solved = True
+
+    def start_background_solve(self):
+        """
+        Starts solving in a background thread, so it's (hopefully) finished by the first move.
+        """
+        if self.solve_thread is None:
+            self.solve_thread = threading.Thread(target=self.solve, daemon=True)
+            self.solve_thread.start()
+
+    def expand_state(self, index):
+        """
+        Gets the outcomes of each action of a state in the form:
+        [[[successor_index, probability, reward], ...], ...]
+        (an empty list if the state has no actions), expanding the state only the first time.
+        """
+        answer = self.expansions.get(index)
+        if answer is None:
+            state = self.get_state_spots(index)
+            self.solver_board.set_spots(state)
+            self.solver_board.player_turn = True
+
+            possible_moves = self.solver_board.get_possible_next_moves()
+            answer = [[[self.get_value(next_state)[1], probability, reward]
+                       for next_state, probability, reward in self.get_action_outcomes(state, move, possible_moves)]
+                      for move in possible_moves]
+            self.expansions[index] = answer
+
+        return answer
+
+    def backup_state(self, index):
+        """
+        Backs up the value of a single state in place, and returns the values of its actions
+        (an empty list if it has none).
+        """
+        values = self.states.values
+        action_values = [sum(probability * (reward + self.discount_factor * values[successor])
+                             for successor, probability, reward in outcomes) for outcomes in self.expand_state(index)]
+
+        if action_values:
+            values[index] = max(action_values)
+        else:
+            values[index] = self.LOSING_STATES
+
+        return action_values
+
+    def run_trial(self, index, theta=0.0001):
+        """
+        Simulates a game from the given state, acting greedily on the current values and
+        sampling the opponent's replies, while backing up every state visited.  Returns the
+        largest change made to a value.
+        """
+        delta = 0
+        for _ in range(self.rtdp_max_trial_length):
+            old_value = self.states.values[index]
+            action_values = self.backup_state(index)
+            delta = max(delta, abs(self.states.values[index] - old_value))
+            if not action_values:
                 break
 
-        self.board.reset_board()
-        self.calculate_policy()
+            outcomes = self.expand_state(index)[action_values.index(max(action_values))]
+            threshold = random.random() * sum(probability for _, probability, _ in outcomes)
+            for successor, probability, _ in outcomes:
+                threshold -= probability
+                if threshold <= 0:
+                    break
+            index = successor
 
-    def calculate_policy(self):
-        for state in self.states:
-            expected_value = self.calculate_expected_value(state)       # get values of actions
-            self.policy[state] = [0 for i in expected_value]            # init policy's values for this state
+        return delta
+
+    def plan(self, spots):
+        """
+        Runs RTDP trials from the given configuration until the trial or time budget runs out (or
+        the move deadline passes), or a trial no longer changes any value by theta or more.
+        """
+        if self.opponent_model is None:
+            self.prepare_solver()
+
+        index = self.get_value(spots)[1]
+        start_time = time.perf_counter()
+        num_trials = 0
+        while self.rtdp_trials is None or num_trials < self.rtdp_trials:
+            if self.rtdp_time is not None and time.perf_counter() - start_time >= self.rtdp_time:
+                break
+            if self.move_deadline is not None and time.perf_counter() >= self.move_deadline:
+                break
+            num_trials += 1
+            if self.run_trial(index, self.theta) < self.theta:
+                break
 
-            best_action = np.argmax(expected_value)                     # find best action in this state
-            self.policy[state, best_action] = 1.0                       # assign best action to 1
+        return index
 
     def game_completed(self):
         pass
@@ -134,9 +483,14 @@ class Value_Iteration_AI(Player):
         """
         Gets the desired next move from the AI.
         """
-        current_state = self.board.spots                            # determine current state
-        determine_policies = np.array(self.policy[current_state])   # obtain policy array for current state
-        possible_actions = self.board.get_possible_next_moves()     # obtain available actions
+        if self.rtdp:
+            action_values = self.backup_state(self.plan(self.board.spots))
+            return self.board.get_possible_next_moves()[action_values.index(max(action_values))]
+
+        self.solve()
 
-        return possible_actions[determine_policies == 1]            # return selected action whose value is 1
+        packed_move = self.policy.get(self.board.get_position_key(self.board.spots, True))
+        if packed_move is None:                                     # not a state the policy knows
+            return self.board.get_possible_next_moves()[0]
 
+        return self.board.unpack_move(packed_move)                  # return the best action of the state